@@ -0,0 +1,167 @@
+"""Per-client admission control for the LLM-backed endpoints."""
+import ipaddress
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class Limits(NamedTuple):
+    rate: float            # requests per second added to the bucket
+    burst: int             # bucket size, i.e. requests allowed back to back
+    token_budget: int      # estimated LLM tokens allowed per window
+    window_seconds: float  # length of the rolling budget window
+
+
+class ClientKey(NamedTuple):
+    address: str                     # the caller's network address
+    client_id: Optional[str] = None  # caller-chosen id, only ever a sub-key of address
+
+
+def parse_networks(spec: str) -> List[Network]:
+    """Networks from a comma-separated list of addresses and CIDR ranges"""
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip()]
+
+
+def _trusted(address: str, trusted: Sequence[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def client_address(peer: Optional[str], forwarded_for: Optional[str], trusted: Sequence[Network]) -> str:
+    """The address a request is charged to.
+
+    The peer address, unless the peer is a trusted proxy: then the right-most
+    X-Forwarded-For hop that is not itself a trusted proxy. Hops further left
+    are written by the client and are never used.
+    """
+    peer = peer or "unknown"
+    if not _trusted(peer, trusted):
+        return peer
+    hops = [hop.strip() for hop in (forwarded_for or "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _trusted(hop, trusted):
+            return hop
+    return hops[0] if hops else peer
+
+
+class OverLimit(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Over the {reason} limit; retry after {math.ceil(retry_after)}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _ClientState:
+    __slots__ = ("tokens", "refilled_at", "usage", "used")
+
+    def __init__(self, burst: int, now: float):
+        self.tokens = float(burst)
+        self.refilled_at = now
+        self.usage: Deque[Tuple[float, int]] = deque()  # (time, estimated tokens)
+        self.used = 0
+
+
+class AdmissionController:
+    """Token bucket plus rolling LLM token budget per client and caller kind.
+
+    Every admitted request takes one token from a bucket, which refills at
+    ``rate`` per second up to ``burst``, and charges its estimated prompt and
+    completion tokens to a budget covering the last ``window_seconds``. Each
+    request is charged twice: to its client (the ``client_id`` within its
+    address, or the bare address) under ``limits``, and to its address under
+    ``clients_per_address`` times those limits. Callers sharing an address
+    (e.g. behind NAT) can get separate budgets by sending ids, but inventing
+    new ids never buys more than the address's limits. ``admit`` raises
+    ``OverLimit`` with the number of seconds after which the same request
+    would be admitted. Interactive and batch callers have separate limits and
+    separate buckets. State is kept in LRUs of at most ``max_clients``
+    entries per kind.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Limits],
+        max_clients: int = 10000,
+        clients_per_address: int = 4,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.limits = limits
+        self.clients_per_address = max(1, clients_per_address)
+        n = self.clients_per_address
+        self.address_limits = {
+            kind: limits._replace(rate=limits.rate * n, burst=limits.burst * n, token_budget=limits.token_budget * n)
+            for kind, limits in limits.items()
+        }
+        self.max_clients = max(1, max_clients)
+        self._clock = clock
+        self._clients: Dict[str, "OrderedDict[str, _ClientState]"] = {kind: OrderedDict() for kind in limits}
+        self._addresses: Dict[str, "OrderedDict[str, _ClientState]"] = {kind: OrderedDict() for kind in limits}
+        self.admitted = 0
+        self.denied = 0
+
+    def _state(self, states: "OrderedDict[str, _ClientState]", key: str, limits: Limits, now: float) -> _ClientState:
+        state = states.get(key)
+        if state is None:
+            state = states[key] = _ClientState(limits.burst, now)
+            while len(states) > self.max_clients:
+                states.popitem(last=False)
+        else:
+            states.move_to_end(key)
+        state.tokens = min(limits.burst, state.tokens + (now - state.refilled_at) * limits.rate)
+        state.refilled_at = now
+        horizon = now - limits.window_seconds
+        while state.usage and state.usage[0][0] <= horizon:
+            state.used -= state.usage.popleft()[1]
+        return state
+
+    def admit(self, kind: str, key: ClientKey, estimated_tokens: int) -> None:
+        now = self._clock()
+        limits, address_limits = self.limits[kind], self.address_limits[kind]
+        charged = (
+            (self._state(self._clients[kind], f"{key.address}/{key.client_id or ''}", limits, now), limits),
+            (self._state(self._addresses[kind], key.address, address_limits, now), address_limits),
+        )
+
+        refusals = []
+        for state, state_limits in charged:
+            if state.tokens < 1:
+                rate = state_limits.rate
+                refusals.append(OverLimit("rate", (1 - state.tokens) / rate if rate > 0 else state_limits.window_seconds))
+            elif state.used + estimated_tokens > state_limits.token_budget:
+                refusals.append(OverLimit(
+                    "token budget", self._budget_retry_after(state, state_limits, estimated_tokens, now)
+                ))
+        if refusals:
+            self.denied += 1
+            raise max(refusals, key=lambda refusal: refusal.retry_after)
+
+        for state, _ in charged:
+            state.tokens -= 1
+            state.usage.append((now, estimated_tokens))
+            state.used += estimated_tokens
+        self.admitted += 1
+
+    def _budget_retry_after(self, state: _ClientState, limits: Limits, estimated_tokens: int, now: float) -> float:
+        # Wait until enough of the oldest usage has left the window
+        used = state.used
+        for at, tokens in state.usage:
+            used -= tokens
+            if used + estimated_tokens <= limits.token_budget:
+                return max(0.0, at + limits.window_seconds - now)
+        return limits.window_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "admitted": self.admitted,
+            "denied": self.denied,
+            "clients": {kind: len(clients) for kind, clients in self._clients.items()},
+            "addresses": {kind: len(addresses) for kind, addresses in self._addresses.items()},
+            "clients_per_address": self.clients_per_address,
+            "limits": {kind: limits._asdict() for kind, limits in self.limits.items()},
+        }
@@ -0,0 +1,106 @@
+"""Searchable archive over the journal tables synced from the client."""
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pagination import STREAM_BATCH_SIZE, json_default
+from sync import SYNC_TABLES
+
+# Synced tables whose content is searchable, and the field holding it
+TEXT_FIELDS = {
+    'reflections': 'text',
+    'journalEntries': 'content',
+}
+
+# Columns of the CSV export, in order; list values are joined with ";"
+EXPORT_COLUMNS = {
+    'sessions': ['local_key', 'startedAt', 'completedAt', 'toneTags', 'archetypeId', 'petals'],
+    'reflections': ['local_key', 'sessionId', 'petal', 'text', 'tone', 'createdAt'],
+    'journalEntries': ['local_key', 'sessionId', 'petal', 'content', 'createdAt'],
+}
+
+# Newest first, tie-broken by the Dexie key
+SORT_FIELD = 'created_at'
+ID_FIELD = 'local_key'
+
+# Rows written per chunk of a streamed export
+EXPORT_CHUNK_ROWS = 500
+
+
+class InvalidArchiveQuery(ValueError):
+    pass
+
+
+async def session_keys(db, client_id: str, tone: Optional[str], archetype: Optional[str]) -> List[Any]:
+    """Dexie ids of the client's sessions with the given tone tag and/or archetype"""
+    query: Dict[str, Any] = {'client_id': client_id}
+    if tone:
+        query['toneTags'] = tone
+    if archetype:
+        query['archetypeId'] = archetype
+    sessions = db[SYNC_TABLES['sessions'].collection].find(query, {'_id': 0, 'id': 1})
+    return [session['id'] async for session in sessions if 'id' in session]
+
+
+async def archive_filter(
+    db, client_id: str, table: str, q: Optional[str], tone: Optional[str], archetype: Optional[str]
+) -> Dict[str, Any]:
+    """Mongo filter for one client's records of a table.
+
+    ``q`` is a full-text search over reflection text or journal content.
+    Sessions carry their own tone tags and archetype; reflections carry
+    their own tone tags; any other filter goes through the owning session.
+    """
+    query: Dict[str, Any] = {'client_id': client_id}
+    if q:
+        if table not in TEXT_FIELDS:
+            raise InvalidArchiveQuery(f"Text search is only available for {', '.join(TEXT_FIELDS)}")
+        query['$text'] = {'$search': q}
+
+    if table == 'sessions':
+        if tone:
+            query['toneTags'] = tone
+        if archetype:
+            query['archetypeId'] = archetype
+        return query
+
+    if table == 'reflections' and tone:
+        query['tone'] = tone
+        tone = None
+    if tone or archetype:
+        query['sessionId'] = {'$in': await session_keys(db, client_id, tone, archetype)}
+    return query
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return ";".join(str(item) for item in value)
+    if value is None:
+        return ""
+    return value
+
+
+async def export_chunks(collection, table: str, query: Dict[str, Any], fmt: str) -> AsyncIterator[str]:
+    """Stream every matching record as NDJSON or CSV, a few hundred rows per chunk"""
+    documents = collection.find(query, {'_id': 0})
+    documents = documents.sort([(SORT_FIELD, -1), (ID_FIELD, -1)]).batch_size(STREAM_BATCH_SIZE)
+
+    columns = EXPORT_COLUMNS[table]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(columns)
+    rows = 0
+    async for document in documents:
+        if fmt == 'csv':
+            writer.writerow([_csv_value(document.get(column)) for column in columns])
+        else:
+            buffer.write(json.dumps(document, default=json_default) + "\n")
+        rows += 1
+        if rows % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,79 @@
+"""Micro-benchmark: compiled classifier vs. the original per-indicator scans.
+
+Usage: python benchmarks/classifier_bench.py [--sizes 1000,100000,1000000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classifier import ARCHETYPE_INDICATORS, TONE_INDICATORS, classify_many  # noqa: E402
+
+SAMPLE_TEXTS = [
+    "I sense a gentle stirring in you, something soft and tender wanting to emerge.",
+    "There's something heavy here, a weight you have carried with courage for a long time.",
+    "What I'm hearing is a quiet trust, a calm and clear understanding of your own heart.",
+    "It seems the path is asking you to listen, to explore what wants to be created anew.",
+    "I feel anxious and restless today and I don't know what to make of it.",
+    "tired",
+]
+
+
+def legacy_extract_tone_tags(response_text):
+    found_tags = []
+    response_lower = response_text.lower()
+    for tag, indicators in TONE_INDICATORS.items():
+        if any(indicator in response_lower for indicator in indicators):
+            found_tags.append(tag)
+    return found_tags[:3]
+
+
+def legacy_select_archetype(tone_tags, journal_text):
+    journal_lower = journal_text.lower()
+    combined_signals = tone_tags + []
+    for archetype, words in ARCHETYPE_INDICATORS.items():
+        if any(word in journal_lower for word in words):
+            combined_signals.append(archetype)
+    archetype_counts = {}
+    for signal in combined_signals:
+        if signal in ARCHETYPE_INDICATORS:
+            archetype_counts[signal] = archetype_counts.get(signal, 0) + 1
+    if archetype_counts:
+        return max(archetype_counts, key=archetype_counts.get)
+    return 'listener'
+
+
+def run_legacy(texts):
+    for text in texts:
+        legacy_select_archetype(legacy_extract_tone_tags(text), text)
+
+
+def run_compiled(texts):
+    for result in classify_many(texts):
+        result.tone_tags
+        result.archetype
+
+
+def timed(fn, texts):
+    start = time.perf_counter()
+    fn(texts)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    args = parser.parse_args()
+
+    print(f"{'texts':>10} {'legacy s':>10} {'compiled s':>11} {'speedup':>8}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(size)]
+        legacy = timed(run_legacy, texts)
+        compiled = timed(run_compiled, texts)
+        print(f"{size:>10} {legacy:>10.3f} {compiled:>11.3f} {legacy / compiled:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
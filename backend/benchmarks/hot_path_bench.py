@@ -0,0 +1,188 @@
+"""CPU per request of the reflect, session and status endpoints, before and after hot_path.
+
+Builds two in-process apps with the same routes. "before" does what the
+endpoints did originally: rebuild the bloom context dict and prompt f-string,
+return Pydantic models through ``response_model`` and let FastAPI encode dicts
+with ``jsonable_encoder``. "after" renders the precompiled templates, builds a
+slotted ``Reflection`` and answers with ``ORJSONResponse``. The LLM and Mongo
+are left out (fixed reply, in-memory session) so only the per-request CPU the
+worker spends on routing, validation, prompt building and serialization is
+measured, with ``time.process_time``. Before and after runs alternate and the
+best of ``--repeats`` is reported, which keeps scheduler noise out.
+
+Usage: python benchmarks/hot_path_bench.py [--requests 20000] [--repeats 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "hall_hot_path_bench")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import ORJSONResponse  # noqa: E402
+
+from hot_path import BLOOM_CONTEXTS, PromptTemplates, Reflection  # noqa: E402
+from server import (  # noqa: E402
+    MirrorRequest, MirrorResponse, StatusCheck, StatusCheckCreate, UserSession, extract_tone_tags
+)
+
+REPLY = "I can sense that gentle stirring in you. Sometimes it whispers, sometimes it calls out more boldly."
+TONE_TAGS = extract_tone_tags(REPLY)
+MEMORY = "Earlier in this journey:\n- B1: feeling restless but hopeful (restless, hopeful)"
+REFLECT_BODY = json.dumps({
+    "session_id": "bench-session",
+    "bloom_id": "B3",
+    "journal_text": "I keep telling myself I have to earn rest before I can take it, and it weighs on me.",
+    "user_history": [],
+}).encode()
+STATUS_BODY = json.dumps({"client_name": "bench"}).encode()
+
+
+def legacy_build_mirror_prompt(bloom_id, journal_text, memory=""):
+    """The prompt builder as it was before the templates were precompiled"""
+    bloom_context = {
+        'B1': "The user is exploring what feels different about them today in their opening reflection.",
+        'B2': "The user is naming and sitting with a feeling that's present for them.",
+        'B3': "The user is examining a belief that might be creating heaviness.",
+        'B4': "The user is looking at a challenge as a potential doorway or catalyst.",
+        'B5': "The user is listening for inner guidance and wisdom.",
+        'B6': "The user is sensing what invitation or next step wants to emerge.",
+        'B7': "The user is integrating what has shifted during their spiral journey.",
+        'B8': "The user is ready to meet their archetype presence - who is walking with them."
+    }
+
+    context = bloom_context.get(bloom_id, "The user is in reflection.")
+    if memory:
+        context = f"{context}\n\n{memory}"
+
+    return f"""Context: {context}
+
+User's reflection: "{journal_text}"
+
+Please reflect back what you sense stirring in this person. Respond as the Mirror - warm, conversational, and slightly otherworldly. Help them feel seen and met exactly as they are."""
+
+
+def session_document():
+    session = UserSession(blooms_unlocked=8, total_sessions=3).dict()
+    session['started_at'] = session['started_at'].isoformat()
+    return session
+
+
+def build_before_app():
+    app = FastAPI()
+    session = session_document()
+
+    @app.post("/api/mirror/reflect", response_model=MirrorResponse)
+    async def mirror_reflect(request: MirrorRequest):
+        legacy_build_mirror_prompt(request.bloom_id, request.journal_text, MEMORY)
+        return MirrorResponse(text=REPLY, tone_tags=TONE_TAGS, archetype_id=None)
+
+    @app.get("/api/sessions/{session_id}")
+    async def get_session(session_id: str):
+        return dict(session)
+
+    @app.post("/api/status", response_model=StatusCheck)
+    async def create_status_check(input: StatusCheckCreate):
+        return StatusCheck(**input.dict())
+
+    return app
+
+
+def build_after_app():
+    app = FastAPI()
+    session = session_document()
+    templates = PromptTemplates(BLOOM_CONTEXTS)
+
+    @app.post("/api/mirror/reflect", response_model=MirrorResponse)
+    async def mirror_reflect(request: MirrorRequest):
+        templates.render(request.bloom_id, request.journal_text, MEMORY)
+        return ORJSONResponse(Reflection(REPLY, TONE_TAGS, None).dict())
+
+    @app.get("/api/sessions/{session_id}")
+    async def get_session(session_id: str):
+        return ORJSONResponse(dict(session))
+
+    @app.post("/api/status", response_model=StatusCheck)
+    async def create_status_check(input: StatusCheckCreate):
+        return ORJSONResponse(StatusCheck(**input.dict()).dict())
+
+    return app
+
+
+async def drive(app, method, path, body, requests):
+    """Mean CPU microseconds per request, called straight through ASGI"""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "server": ("bench", 80), "client": ("bench", 1),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{method} {path} answered {message['status']}")
+
+    # Warm up routing and pydantic caches before timing
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    start = time.process_time()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.process_time() - start) / requests * 1e6
+
+
+def per_call_ns(fn, calls):
+    start = time.process_time_ns()
+    for _ in range(calls):
+        fn()
+    return (time.process_time_ns() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    templates = PromptTemplates(BLOOM_CONTEXTS)
+    assert templates.render("B3", "text", MEMORY) == legacy_build_mirror_prompt("B3", "text", MEMORY)
+
+    routes = {
+        "reflect": ("POST", "/api/mirror/reflect", REFLECT_BODY),
+        "get_session": ("GET", "/api/sessions/bench-session", b""),
+        "create_status": ("POST", "/api/status", STATUS_BODY),
+    }
+    apps = {"before": build_before_app(), "after": build_after_app()}
+    report = {"prompt_ns": {
+        "before": round(per_call_ns(lambda: legacy_build_mirror_prompt("B3", "text", MEMORY), args.calls)),
+        "after": round(per_call_ns(lambda: templates.render("B3", "text", MEMORY), args.calls)),
+    }, "reply_ns": {
+        "before": round(per_call_ns(lambda: MirrorResponse(text=REPLY, tone_tags=TONE_TAGS, archetype_id=None), args.calls)),
+        "after": round(per_call_ns(lambda: Reflection(REPLY, TONE_TAGS, None), args.calls)),
+    }}
+    for name, (method, path, body) in routes.items():
+        timings = {"before": [], "after": []}
+        for _ in range(args.repeats):
+            for side, app in apps.items():
+                timings[side].append(asyncio.run(drive(app, method, path, body, args.requests)))
+        before, after = min(timings["before"]), min(timings["after"])
+        report[f"{name}_cpu_us"] = {
+            "before": round(before, 2),
+            "after": round(after, 2),
+            "saved_pct": round((before - after) / before * 100, 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Offline load test: drive the FastAPI app in-process with a stub LLM.
+
+The app is served through httpx's ASGI transport, so no port, proxy or remote
+preview URL is involved. Mirror calls go to a stub LLM with a configurable
+latency distribution and error rate, and Mongo is either an in-memory
+stand-in (mongomock-motor) or a local server given with --mongo-url.
+
+Results are printed (and optionally written) as JSON so runs can be diffed
+between commits.
+
+Usage:
+  python benchmarks/load_test.py --concurrency 50 --requests 5000 \\
+      --mix reflect=6,create_session=1,get_session=1,get_status=1,post_status=1 \\
+      --llm-latency lognormal:800,0.4 --llm-error-rate 0.01 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+JOURNAL_TEXTS = [
+    "tired",
+    "I don't know",
+    "I feel anxious and restless today and my mind keeps racing.",
+    "Something feels lighter, like a new path is opening and I want to explore it.",
+    "There's a heavy weight on me, I should be doing more but I can't.",
+    "I want to listen more closely to the quiet voice inside.",
+]
+
+
+def latency_sampler(spec):
+    """Parse fixed:MS, uniform:LO,HI or lognormal:MEAN_MS,SIGMA into a sampler returning seconds"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0] / 1000
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal":
+        mean_ms, sigma = values
+        mu = math.log(mean_ms) - sigma ** 2 / 2  # so the distribution mean is mean_ms
+        return lambda: random.lognormvariate(mu, sigma) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class StubUserMessage:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubMirrorChat:
+    """Stands in for LlmChat: sleeps for a sampled latency, then replies"""
+
+    replies = [
+        "I sense a gentle stirring in you, something tender wanting to emerge.",
+        "There's something heavy here, and you have carried it with courage.",
+        "What I'm hearing is a quiet trust, a calm and clear knowing.",
+    ]
+
+    def __init__(self, sample_latency, error_rate):
+        self.sample_latency = sample_latency
+        self.error_rate = error_rate
+
+    async def send_message(self, user_message):
+        await asyncio.sleep(self.sample_latency())
+        if random.random() < self.error_rate:
+            raise RuntimeError("stub LLM error")
+        return random.choice(self.replies)
+
+
+def install_stub_llm_module():
+    """Stand in for emergentintegrations when it is not installed, so the LLM warm-up passes"""
+    try:
+        import emergentintegrations.llm.chat  # noqa: F401
+    except ImportError:
+        import types
+        package = types.ModuleType("emergentintegrations")
+        llm = types.ModuleType("emergentintegrations.llm")
+        chat = types.ModuleType("emergentintegrations.llm.chat")
+        chat.LlmChat = None
+        chat.UserMessage = StubUserMessage
+        sys.modules.update({
+            "emergentintegrations": package,
+            "emergentintegrations.llm": llm,
+            "emergentintegrations.llm.chat": chat,
+        })
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else None,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+    }
+
+
+class Workload:
+    def __init__(self, client, session_ids):
+        self.client = client
+        self.session_ids = session_ids
+
+    async def reflect(self):
+        session_id = random.choice(self.session_ids)
+        return await self.client.post("/api/mirror/reflect", json={
+            "session_id": session_id,
+            "bloom_id": f"B{random.randint(1, 8)}",
+            "journal_text": random.choice(JOURNAL_TEXTS),
+        })
+
+    async def create_session(self):
+        response = await self.client.post("/api/sessions", json={"total_sessions": random.randint(1, 3)})
+        if response.status_code == 200:
+            self.session_ids.append(response.json()["id"])
+        return response
+
+    async def get_session(self):
+        return await self.client.get(f"/api/sessions/{random.choice(self.session_ids)}")
+
+    async def get_status(self):
+        return await self.client.get("/api/status", params={"limit": 100})
+
+    async def post_status(self):
+        return await self.client.post("/api/status", json={"client_name": "load-test"})
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if not hasattr(Workload, name):
+            raise ValueError(f"Unknown operation in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    import httpx
+
+    install_stub_llm_module()
+    import server
+
+    # One INFO line per request would swamp the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        mongo = AsyncIOMotorClient(args.mongo_url)
+        await mongo.drop_database(args.db)
+        database = mongo[args.db]
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        mongo = None
+        database = AsyncMongoMockClient()[args.db]
+    server.use_database(database)
+
+    sample_latency = latency_sampler(args.llm_latency)
+    server.get_mirror_chat = lambda session_id: StubMirrorChat(sample_latency, args.llm_error_rate)
+
+    mix = parse_mix(args.mix)
+    operations, weights = list(mix), list(mix.values())
+    samples = {name: [] for name in operations}
+    remaining = args.requests
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with server.app.router.lifespan_context(server.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            workload = Workload(client, [])
+            for _ in range(max(10, args.concurrency)):
+                await workload.create_session()
+
+            async def worker():
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    name = random.choices(operations, weights)[0]
+                    began = time.perf_counter()
+                    try:
+                        response = await getattr(workload, name)()
+                        ok = response.status_code < 400
+                    except Exception:
+                        ok = False
+                    samples[name].append((time.perf_counter() - began, ok))
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+    if mongo is not None:
+        await mongo.drop_database(args.db)
+        mongo.close()
+
+    everything = [sample for per_op in samples.values() for sample in per_op]
+    return {
+        "revision": git_revision(),
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "mix": mix,
+            "llm_latency": args.llm_latency,
+            "llm_error_rate": args.llm_error_rate,
+            "mongo": "local" if args.mongo_url else "in-memory",
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": summarize(everything, elapsed),
+        "operations": {name: summarize(per_op, elapsed) for name, per_op in samples.items()},
+        "server_counters": {
+            "mirror_fallbacks": {
+                ",".join(labels): total for labels, total in server.metrics.mirror_fallbacks.snapshot().items()
+            },
+            "llm_guard": server.llm_guard.stats(),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--mix", default="reflect=6,create_session=1,get_session=1,get_status=1,post_status=1")
+    parser.add_argument("--llm-latency", default="lognormal:800,0.4", help="fixed:MS | uniform:LO,HI | lognormal:MEAN_MS,SIGMA")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--mongo-url", default=None, help="use a local MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--db", default="hall_load_test")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", args.db)
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
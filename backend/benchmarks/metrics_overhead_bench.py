@@ -0,0 +1,84 @@
+"""Measure the hot-path cost of the metrics layer.
+
+Reports the cost of a single Histogram.observe / Counter.inc and the added
+per-request latency of MetricsMiddleware around a trivial ASGI route, called
+in-process so network noise does not hide the difference.
+
+Usage: python benchmarks/metrics_overhead_bench.py [--requests 20000]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI  # noqa: E402
+
+from metrics import Counter, Histogram, MetricsMiddleware  # noqa: E402
+
+
+def per_call_ns(fn, calls):
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter_ns() - start) / calls
+
+
+def build_app(instrumented):
+    app = FastAPI()
+
+    @app.get("/api/sessions/{session_id}")
+    async def get_session(session_id: str):
+        return {"id": session_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, requests):
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/sessions/abc", "raw_path": b"/api/sessions/abc", "root_path": "",
+        "query_string": b"", "headers": [], "server": ("bench", 80), "client": ("bench", 1),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Warm up routing and pydantic caches before timing
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=500000)
+    args = parser.parse_args()
+
+    histogram = Histogram("bench_seconds", "bench", ("route",))
+    counter = Counter("bench_total", "bench", ("reason",))
+    plain_us = asyncio.run(drive(build_app(False), args.requests))
+    instrumented_us = asyncio.run(drive(build_app(True), args.requests))
+    print(json.dumps({
+        "histogram_observe_ns": round(per_call_ns(lambda: histogram.observe(0.0123, "/api/x"), args.calls)),
+        "counter_inc_ns": round(per_call_ns(lambda: counter.inc("error"), args.calls)),
+        "request_us_without_middleware": round(plain_us, 2),
+        "request_us_with_middleware": round(instrumented_us, 2),
+        "middleware_overhead_us": round(instrumented_us - plain_us, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark get_session lookup latency with and without the id index.
+
+Fills a scratch database with N synthetic hall_sessions and times
+find_one({"id": ...}, {"_id": 0}) for random ids, first as a collection scan
+and then with the indexes from indexes.REQUIRED_INDEXES.
+
+Usage: python benchmarks/session_lookup_bench.py [--sizes 10000,1000000,10000000]
+       [--mongo-url mongodb://localhost:27017] [--db hall_bench]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+from indexes import REQUIRED_INDEXES, ensure_indexes  # noqa: E402
+
+INSERT_BATCH = 10000
+
+
+async def populate(collection, size):
+    """Insert synthetic sessions and return a sample of their ids"""
+    await collection.drop()
+    sample = []
+    start = datetime.utcnow() - timedelta(days=365)
+    for offset in range(0, size, INSERT_BATCH):
+        batch = []
+        for i in range(offset, min(size, offset + INSERT_BATCH)):
+            session_id = str(uuid.uuid4())
+            batch.append({
+                "id": session_id,
+                "started_at": (start + timedelta(seconds=i)).isoformat(),
+                "completed_at": None,
+                "blooms_unlocked": 8,
+                "total_sessions": 3,
+                "tone_tags": ["peace", "gentle"],
+                "archetype_id": None,
+            })
+            if random.random() < 0.001 or len(sample) < 100:
+                sample.append(session_id)
+        await collection.insert_many(batch, ordered=False)
+    return sample
+
+
+async def time_lookups(collection, ids, lookups):
+    latencies = []
+    for session_id in random.choices(ids, k=lookups):
+        began = time.perf_counter()
+        await collection.find_one({"id": session_id}, {"_id": 0})
+        latencies.append((time.perf_counter() - began) * 1000)
+    latencies.sort()
+    return {
+        "lookups": lookups,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "max_ms": round(latencies[-1], 3),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,1000000,10000000")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="hall_bench")
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--scan-lookups", type=int, default=20, help="lookups timed without the index")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+    results = []
+    try:
+        for size in (int(n) for n in args.sizes.split(",")):
+            ids = await populate(db.hall_sessions, size)
+            unindexed = await time_lookups(db.hall_sessions, ids, args.scan_lookups)
+            await ensure_indexes(db, [spec for spec in REQUIRED_INDEXES if spec.collection == "hall_sessions"])
+            indexed = await time_lookups(db.hall_sessions, ids, args.lookups)
+            results.append({"sessions": size, "collection_scan": unindexed, "indexed": indexed})
+            print(json.dumps(results[-1]), flush=True)
+    finally:
+        await client.drop_database(args.db)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
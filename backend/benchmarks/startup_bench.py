@@ -0,0 +1,183 @@
+"""Cold-start benchmark: import time, time to first response and time to ready.
+
+Each run starts a fresh Python process, the way a new uvicorn worker starts,
+and reports (in seconds since the process was spawned):
+
+  import           ``import server`` finished
+  first_response   ``GET /api/`` answered
+  ready            ``GET /api/ready`` returned 200 (Mongo reachable, LLM SDK loaded)
+
+By default the child serves the app in-process through httpx's ASGI transport
+with the in-memory Mongo stand-in, so no port or database is needed;
+--mongo-url uses a real server and --uvicorn boots ``uvicorn server:app`` and
+polls it over HTTP instead.
+
+Usage:
+  python benchmarks/startup_bench.py --runs 5
+  python benchmarks/startup_bench.py --uvicorn --mongo-url mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+async def child(spawned_at, mongo_url, ready_timeout):
+    """Runs inside the fresh process; prints one JSON line of timings"""
+    started = time.time()
+    import server
+    imported = time.time()
+    llm_imported_at_import = "emergentintegrations.llm.chat" in sys.modules
+
+    import httpx
+    import load_test
+    load_test.install_stub_llm_module()
+    if not mongo_url:
+        from mongomock_motor import AsyncMongoMockClient
+        server.use_database(AsyncMongoMockClient()["hall_startup_bench"])
+
+    app = server.create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup-bench") as client:
+            response = await client.get("/api/")
+            first_response = time.time() if response.status_code == 200 else None
+            ready = await poll_ready(lambda: client.get("/api/ready"), ready_timeout)
+
+    print(json.dumps({
+        "interpreter": started - spawned_at,
+        "import": imported - spawned_at,
+        "first_response": first_response - spawned_at if first_response else None,
+        "ready": ready - spawned_at if ready else None,
+        "llm_sdk_loaded_at_import": llm_imported_at_import,
+    }))
+
+
+async def poll_ready(get, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = await get()
+        if response.status_code == 200:
+            return time.time()
+        await asyncio.sleep(0.005)
+    return None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def http_status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def run_uvicorn(env, ready_timeout):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/api"
+    spawned_at = time.time()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        first_response = ready = None
+        deadline = spawned_at + ready_timeout
+        while time.time() < deadline and first_response is None:
+            if http_status(f"{base}/") == 200:
+                first_response = time.time()
+            else:
+                time.sleep(0.005)
+        while first_response and time.time() < deadline and ready is None:
+            if http_status(f"{base}/ready") == 200:
+                ready = time.time()
+            else:
+                time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait()
+    return {
+        "first_response": first_response - spawned_at if first_response else None,
+        "ready": ready - spawned_at if ready else None,
+    }
+
+
+def run_in_process(env, mongo_url, ready_timeout):
+    spawned_at = time.time()
+    output = subprocess.check_output(
+        [sys.executable, __file__, "--child", str(spawned_at), "--mongo-url", mongo_url or "",
+         "--ready-timeout", str(ready_timeout)],
+        cwd=BACKEND_DIR, env=env, text=True
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(runs, key):
+    values = [run[key] for run in runs if run.get(key) is not None]
+    if not values:
+        return None
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "min_ms": round(min(values) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--uvicorn", action="store_true", help="boot a real uvicorn worker and poll it over HTTP")
+    parser.add_argument("--mongo-url", default=None, help="use a real MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--ready-timeout", type=float, default=30.0)
+    parser.add_argument("--child", type=float, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        asyncio.run(child(args.child, args.mongo_url, args.ready_timeout))
+        return
+
+    if args.uvicorn and not args.mongo_url:
+        parser.error("--uvicorn needs --mongo-url; the in-memory stand-in only works in-process")
+
+    env = dict(os.environ)
+    env.setdefault("DB_NAME", "hall_startup_bench")
+    env["MONGO_URL"] = args.mongo_url or env.get("MONGO_URL", "mongodb://localhost:27017")
+
+    runs = []
+    for _ in range(args.runs):
+        if args.uvicorn:
+            runs.append(run_uvicorn(env, args.ready_timeout))
+        else:
+            runs.append(run_in_process(env, args.mongo_url, args.ready_timeout))
+
+    report = {
+        "mode": "uvicorn" if args.uvicorn else "in-process",
+        "mongo": "local" if args.mongo_url else "in-memory",
+        "runs": args.runs,
+        **{key: summarize(runs, key) for key in ("interpreter", "import", "first_response", "ready")},
+        "llm_sdk_loaded_at_import": any(run.get("llm_sdk_loaded_at_import") for run in runs),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
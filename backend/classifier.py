@@ -0,0 +1,157 @@
+"""Single-pass tone and archetype classifier for Mirror text.
+
+All indicator words, with the inflected forms listed for them, are compiled
+once into a lookup table. Each text is tokenized in a single regex pass and every token is
+resolved with one dict lookup, crediting the tone tags and archetypes that
+list it. Matching whole words avoids false positives such as "see" inside
+"seems", and listing inflections rather than appending suffixes keeps out
+words such as "seed" and "news".
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+TONE_INDICATORS = {
+    'peace': ['peaceful', 'calm', 'still', 'serene'],
+    'trust': ['trust', 'faith', 'belief', 'confidence'],
+    'clarity': ['clear', 'understand', 'see', 'realize'],
+    'love': ['love', 'heart', 'compassion', 'care'],
+    'strength': ['strong', 'power', 'courage', 'brave'],
+    'creative': ['create', 'birth', 'new', 'emerge'],
+    'restless': ['restless', 'anxious', 'stirring', 'movement'],
+    'heavy': ['heavy', 'burden', 'weight', 'thick'],
+    'gentle': ['gentle', 'soft', 'tender', 'delicate']
+}
+
+ARCHETYPE_INDICATORS = {
+    'listener': ['listen', 'hear', 'space', 'quiet'],
+    'seeker': ['search', 'explore', 'journey', 'path'],
+    'guardian': ['protect', 'care', 'support', 'help'],
+    'creator': ['create', 'make', 'build', 'birth'],
+    'sage': ['wisdom', 'understand', 'know', 'learn']
+}
+
+DEFAULT_ARCHETYPE = 'listener'
+MAX_TONE_TAGS = 3
+
+# Inflected forms credited like the indicator itself
+INFLECTIONS = {
+    'peaceful': ['peacefully'],
+    'calm': ['calms', 'calmed', 'calming', 'calmer', 'calmly'],
+    'serene': ['serenely'],
+    'trust': ['trusts', 'trusted', 'trusting'],
+    'belief': ['beliefs'],
+    'clear': ['clears', 'cleared', 'clearing', 'clearer', 'clearly'],
+    'understand': ['understands', 'understood', 'understanding'],
+    'see': ['sees', 'seen', 'seeing'],
+    'realize': ['realizes', 'realized', 'realizing', 'realise', 'realises', 'realised', 'realising'],
+    'love': ['loves', 'loved', 'loving'],
+    'heart': ['hearts'],
+    'care': ['cares', 'cared', 'caring'],
+    'strong': ['stronger', 'strongest', 'strongly'],
+    'power': ['powers', 'powerful'],
+    'brave': ['braver', 'bravely'],
+    'create': ['creates', 'created', 'creating'],
+    'birth': ['births'],
+    'new': ['newly'],
+    'emerge': ['emerges', 'emerged', 'emerging'],
+    'anxious': ['anxiously'],
+    'movement': ['movements'],
+    'heavy': ['heavier', 'heavily'],
+    'burden': ['burdens', 'burdened'],
+    'weight': ['weights'],
+    'thick': ['thicker'],
+    'gentle': ['gentler', 'gently'],
+    'soft': ['softer', 'softly'],
+    'tender': ['tenderly'],
+    'delicate': ['delicately'],
+    'listen': ['listens', 'listened', 'listening'],
+    'hear': ['hears', 'heard', 'hearing'],
+    'space': ['spaces'],
+    'quiet': ['quieter', 'quietly'],
+    'search': ['searches', 'searched', 'searching'],
+    'explore': ['explores', 'explored', 'exploring'],
+    'journey': ['journeys', 'journeyed', 'journeying'],
+    'path': ['paths'],
+    'protect': ['protects', 'protected', 'protecting'],
+    'support': ['supports', 'supported', 'supporting'],
+    'help': ['helps', 'helped', 'helping'],
+    'make': ['makes', 'made', 'making'],
+    'build': ['builds', 'built', 'building'],
+    'know': ['knows', 'knew', 'known', 'knowing'],
+    'learn': ['learns', 'learned', 'learnt', 'learning'],
+}
+_WORD = re.compile(r"[a-z]+")
+
+
+def _build_index() -> Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    tones: Dict[str, List[str]] = {}
+    archetypes: Dict[str, List[str]] = {}
+    for tag, words in TONE_INDICATORS.items():
+        for word in words:
+            tones.setdefault(word, []).append(tag)
+    for archetype, words in ARCHETYPE_INDICATORS.items():
+        for word in words:
+            archetypes.setdefault(word, []).append(archetype)
+
+    index: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+    for word in set(tones) | set(archetypes):
+        index[word] = (tuple(tones.get(word, ())), tuple(archetypes.get(word, ())))
+    for word, forms in INFLECTIONS.items():
+        for form in forms:
+            # An indicator spelled out in full wins over an inflected form
+            index.setdefault(form, index[word])
+    return index
+
+
+_INDEX = _build_index()
+_TONE_ORDER = {tag: i for i, tag in enumerate(TONE_INDICATORS)}
+_ARCHETYPE_ORDER = {name: i for i, name in enumerate(ARCHETYPE_INDICATORS)}
+
+
+class Classification(NamedTuple):
+    """Indicator hit counts for one text"""
+    tone_scores: Dict[str, int]
+    archetype_scores: Dict[str, int]
+
+    @property
+    def tone_tags(self) -> List[str]:
+        return top_tone_tags(self.tone_scores)
+
+    @property
+    def archetype(self) -> Optional[str]:
+        return top_archetype(self.archetype_scores)
+
+
+def classify(text: str) -> Classification:
+    """Score tone tags and archetype signals for a text in one pass"""
+    tone_scores: Dict[str, int] = {}
+    archetype_scores: Dict[str, int] = {}
+    lookup = _INDEX.get
+    for word in _WORD.findall(text.lower()):
+        entry = lookup(word)
+        if entry is None:
+            continue
+        tags, archetypes = entry
+        for tag in tags:
+            tone_scores[tag] = tone_scores.get(tag, 0) + 1
+        for archetype in archetypes:
+            archetype_scores[archetype] = archetype_scores.get(archetype, 0) + 1
+    return Classification(tone_scores, archetype_scores)
+
+
+def classify_many(texts: Iterable[str]) -> Iterator[Classification]:
+    """Lazily classify a stream of texts, e.g. to re-score stored reflections"""
+    return map(classify, texts)
+
+
+def top_tone_tags(tone_scores: Dict[str, int], limit: int = MAX_TONE_TAGS) -> List[str]:
+    """Highest scoring tone tags, ties broken by declaration order"""
+    ranked = sorted(tone_scores, key=lambda tag: (-tone_scores[tag], _TONE_ORDER[tag]))
+    return ranked[:limit]
+
+
+def top_archetype(archetype_scores: Dict[str, int]) -> Optional[str]:
+    """Highest scoring archetype, ties broken by declaration order"""
+    if not archetype_scores:
+        return None
+    return min(archetype_scores, key=lambda name: (-archetype_scores[name], _ARCHETYPE_ORDER[name]))
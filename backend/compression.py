@@ -0,0 +1,55 @@
+"""Response compression that leaves streamed responses alone."""
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class GZipCompleteMiddleware:
+    """Gzip responses whose whole body is sent in one message.
+
+    Starlette's GZipMiddleware also compresses streamed responses, and its
+    compressor holds SSE and NDJSON chunks back until the stream ends, which
+    defeats streaming them. Responses sent in more than one body message,
+    already encoded ones and ones under ``minimum_size`` bytes pass through
+    as they are.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, compresslevel: int = 9):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held back until the first body message shows whether the response streams
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            initial, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=initial["headers"])
+            if message.get("more_body", False) or "content-encoding" in headers or len(body) < self.minimum_size:
+                await send(initial)
+                await send(message)
+                return
+
+            body = gzip.compress(body, self.compresslevel)
+            headers["Content-Encoding"] = "gzip"
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(initial)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,196 @@
+"""Bounded per-session conversation memory for Mirror prompts."""
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Iterable, List, NamedTuple, Optional, Tuple
+
+# Rough size of an English token for gpt-4o-mini; close enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Journal excerpt kept for a bloom once it is folded into the summary
+SUMMARY_EXCERPT_TOKENS = 24
+
+RECENT_HEADING = "Most recent blooms:\n"
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def clip(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, on a word boundary"""
+    max_chars = max(1, max_tokens) * CHARS_PER_TOKEN
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + "…"
+
+
+class Turn(NamedTuple):
+    bloom_id: str
+    journal_text: str
+    reply: str
+    tone_tags: Tuple[str, ...]
+
+
+class SummaryLine(NamedTuple):
+    label: str
+    tone_tags: Tuple[str, ...]
+    excerpt: Optional[str]  # dropped first when the summary has to shrink
+
+    def render(self) -> str:
+        line = self.label
+        if self.tone_tags:
+            line += f" ({', '.join(self.tone_tags)})"
+        if self.excerpt:
+            line += f': "{self.excerpt}"'
+        return line
+
+
+class Conversation:
+    __slots__ = ("recent", "summary", "last_used", "rendered")
+
+    def __init__(self, now: float):
+        self.recent: Deque[Turn] = deque()
+        self.summary: List[SummaryLine] = []
+        self.last_used = now
+        self.rendered: Optional[str] = None
+
+
+class ConversationMemory:
+    """What the Mirror remembers of each session's spiral journey.
+
+    The newest ``recent_turns`` blooms are kept verbatim; older ones are
+    folded into a rolling summary of one line per bloom (its tone tags and a
+    short excerpt). Whenever the rendered context would exceed
+    ``token_budget``, summary excerpts are dropped oldest first, then the
+    oldest summary lines themselves, so the prompt stays the same size from
+    the first bloom to the eighth. Sessions are held in an LRU bounded by
+    ``max_sessions`` and forgotten after ``idle_ttl`` seconds; a session
+    this process has not seen can be seeded from the client's
+    ``user_history``.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 600,
+        recent_turns: int = 2,
+        max_sessions: int = 1024,
+        idle_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.token_budget = token_budget
+        self.recent_turns = max(0, recent_turns)
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self.compactions = 0
+
+    def _lookup(self, session_id: str, now: float) -> Optional[Conversation]:
+        conversation = self._sessions.get(session_id)
+        if conversation is not None and now - conversation.last_used > self.idle_ttl:
+            del self._sessions[session_id]
+            return None
+        return conversation
+
+    def _conversation(self, session_id: str) -> Conversation:
+        now = self._clock()
+        conversation = self._lookup(session_id, now)
+        if conversation is None:
+            conversation = self._sessions[session_id] = Conversation(now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        conversation.last_used = now
+        self._sessions.move_to_end(session_id)
+        return conversation
+
+    def seed(self, session_id: str, history: Iterable[str]) -> None:
+        """Start an unknown session's summary from journal texts sent by the client"""
+        if self._lookup(session_id, self._clock()) is not None:
+            return
+        conversation = self._conversation(session_id)
+        for text in history:
+            if text and text.strip():
+                conversation.summary.append(SummaryLine("Earlier", (), clip(text, SUMMARY_EXCERPT_TOKENS)))
+        self._compact(conversation)
+
+    def record(self, session_id: str, bloom_id: str, journal_text: str, reply: str, tone_tags: Iterable[str] = ()) -> None:
+        conversation = self._conversation(session_id)
+        conversation.recent.append(Turn(bloom_id, journal_text, reply, tuple(tone_tags)))
+        while len(conversation.recent) > self.recent_turns:
+            turn = conversation.recent.popleft()
+            conversation.summary.append(
+                SummaryLine(turn.bloom_id, turn.tone_tags, clip(turn.journal_text, SUMMARY_EXCERPT_TOKENS))
+            )
+        self._compact(conversation)
+
+    def context(self, session_id: str, user_history: Optional[List[str]] = None) -> str:
+        """Prompt section describing the journey so far ("" for a new session)"""
+        if user_history:
+            self.seed(session_id, user_history)
+        now = self._clock()
+        conversation = self._lookup(session_id, now)
+        if conversation is None:
+            return ""
+        conversation.last_used = now
+        self._sessions.move_to_end(session_id)
+        if conversation.rendered is None:
+            conversation.rendered = self._render(conversation)
+        return conversation.rendered
+
+    def forget(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def _render_recent(self, conversation: Conversation, field_tokens: Optional[int] = None) -> List[str]:
+        lines = []
+        for turn in conversation.recent:
+            journal_text, reply = turn.journal_text, turn.reply
+            if field_tokens is not None:
+                journal_text, reply = clip(journal_text, field_tokens), clip(reply, field_tokens)
+            lines.append(f'{turn.bloom_id} - they wrote: "{journal_text}" / you reflected: "{reply}"')
+        return lines
+
+    def _render(self, conversation: Conversation) -> str:
+        sections = []
+        if conversation.summary:
+            sections.append("Earlier in this journey:\n" + "\n".join(line.render() for line in conversation.summary))
+        # Long recent entries are clipped so a third of the budget stays for the summary
+        recent_budget = self.token_budget * 2 // 3 if conversation.summary else self.token_budget
+        recent = self._render_recent(conversation)
+        if recent and estimate_tokens(RECENT_HEADING + "\n".join(recent)) > recent_budget:
+            # Whatever the labels and quotes take is not left for the texts
+            framing = estimate_tokens(RECENT_HEADING) + sum(
+                estimate_tokens(f'{turn.bloom_id} - they wrote: "" / you reflected: ""\n') for turn in conversation.recent
+            )
+            recent = self._render_recent(conversation, (recent_budget - framing) // (2 * len(recent)))
+        if recent:
+            sections.append(RECENT_HEADING + "\n".join(recent))
+        return "\n\n".join(sections)
+
+    def _compact(self, conversation: Conversation) -> None:
+        conversation.rendered = None
+        summary = conversation.summary
+        while summary and estimate_tokens(self._render(conversation)) > self.token_budget:
+            self.compactions += 1
+            for i, line in enumerate(summary):
+                if line.excerpt:
+                    if line.tone_tags:
+                        summary[i] = line._replace(excerpt=None)
+                    else:
+                        # Nothing would be left of a seeded line without its excerpt
+                        del summary[i]
+                    break
+            else:
+                summary.pop(0)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "token_budget": self.token_budget,
+            "recent_turns": self.recent_turns,
+            "compactions": self.compactions,
+        }
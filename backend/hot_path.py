@@ -0,0 +1,125 @@
+"""Precompiled prompt templates and compact reply structs for /api/mirror/reflect."""
+import hashlib
+import json
+import logging
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+# What the Mirror is told about each bloom of the spiral journey
+BLOOM_CONTEXTS = {
+    'B1': "The user is exploring what feels different about them today in their opening reflection.",
+    'B2': "The user is naming and sitting with a feeling that's present for them.",
+    'B3': "The user is examining a belief that might be creating heaviness.",
+    'B4': "The user is looking at a challenge as a potential doorway or catalyst.",
+    'B5': "The user is listening for inner guidance and wisdom.",
+    'B6': "The user is sensing what invitation or next step wants to emerge.",
+    'B7': "The user is integrating what has shifted during their spiral journey.",
+    'B8': "The user is ready to meet their archetype presence - who is walking with them.",
+}
+DEFAULT_CONTEXT = "The user is in reflection."
+CLOSING = (
+    "Please reflect back what you sense stirring in this person. Respond as the Mirror - warm, "
+    "conversational, and slightly otherworldly. Help them feel seen and met exactly as they are."
+)
+
+
+class InvalidPromptFile(ValueError):
+    pass
+
+
+class PromptTemplates:
+    """Immutable bloom prompts with their static parts joined once.
+
+    ``render`` only concatenates the per-request parts (conversation memory and
+    the journal text) onto strings built when the templates were loaded, so
+    no dict or f-string is rebuilt per call. Instances are never mutated; a
+    reload builds a new one and swaps the reference. ``version`` is a hash of
+    the prompts, the same in every worker that loaded the same ones.
+    """
+
+    __slots__ = ("_heads", "_default_head", "_tail", "source", "version")
+
+    def __init__(
+        self,
+        contexts: Mapping[str, str],
+        default_context: str = DEFAULT_CONTEXT,
+        closing: str = CLOSING,
+        source: Optional[str] = None
+    ):
+        self._heads = MappingProxyType({bloom_id: "Context: " + context for bloom_id, context in contexts.items()})
+        self._default_head = "Context: " + default_context
+        self._tail = '"\n\n' + closing
+        self.source = source
+        prompts = json.dumps([sorted(self._heads.items()), self._default_head, self._tail])
+        self.version = hashlib.sha1(prompts.encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path: str) -> "PromptTemplates":
+        """Load templates from a JSON file of ``contexts``, ``default_context`` and ``closing``.
+
+        Every key is optional and overrides the built-in prompts; bloom
+        contexts are merged over the built-in ones.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            raise InvalidPromptFile(f"Could not read {path}: {str(e)}")
+        if not isinstance(config, dict):
+            raise InvalidPromptFile(f"{path} must hold a JSON object")
+        contexts = config.get('contexts', {})
+        if not isinstance(contexts, dict) or not all(isinstance(value, str) for value in contexts.values()):
+            raise InvalidPromptFile(f"{path}: contexts must map bloom ids to strings")
+        for key in ('default_context', 'closing'):
+            if not isinstance(config.get(key, ''), str):
+                raise InvalidPromptFile(f"{path}: {key} must be a string")
+        return cls(
+            {**BLOOM_CONTEXTS, **contexts},
+            config.get('default_context') or DEFAULT_CONTEXT,
+            config.get('closing') or CLOSING,
+            source=path
+        )
+
+    def render(self, bloom_id: str, journal_text: str, memory: str = "") -> str:
+        head = self._heads.get(bloom_id, self._default_head)
+        if memory:
+            head = head + "\n\n" + memory
+        return head + '\n\nUser\'s reflection: "' + journal_text + self._tail
+
+    def blooms(self) -> List[str]:
+        return list(self._heads)
+
+
+def load_templates(path: Optional[str]) -> PromptTemplates:
+    """Templates from path, or the built-in ones when unset or unreadable"""
+    if path:
+        try:
+            return PromptTemplates.from_file(path)
+        except InvalidPromptFile as e:
+            logging.error(f"Using built-in Mirror prompts: {str(e)}")
+    return PromptTemplates(BLOOM_CONTEXTS)
+
+
+class Reflection:
+    """A Mirror reply; the slotted counterpart of ``MirrorResponse``.
+
+    Built on every reflection, so it skips Pydantic validation: its fields
+    come from our own code, not from the client. ``dict()`` gives the same
+    shape as ``MirrorResponse.dict()``.
+    """
+
+    __slots__ = ("text", "tone_tags", "archetype_id")
+
+    def __init__(self, text: str, tone_tags: Optional[List[str]] = None, archetype_id: Optional[str] = None):
+        self.text = text
+        self.tone_tags = tone_tags if tone_tags is not None else []
+        self.archetype_id = archetype_id
+
+    def dict(self) -> Dict[str, Any]:
+        return {"text": self.text, "tone_tags": self.tone_tags, "archetype_id": self.archetype_id}
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Reflection) and self.dict() == other.dict()
+
+    def __repr__(self) -> str:
+        return f"Reflection(text={self.text!r}, tone_tags={self.tone_tags!r}, archetype_id={self.archetype_id!r})"
@@ -0,0 +1,154 @@
+"""Idempotency-Key support: replay the stored response for retried POSTs."""
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, NamedTuple, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from reflection_cache import LocalTTLCache
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyError(Exception):
+    pass
+
+
+class KeyReused(IdempotencyError):
+    """The key was already used for a request with a different body"""
+
+
+class KeyInProgress(IdempotencyError):
+    """The first request with this key is still being handled elsewhere"""
+
+
+class Completed(NamedTuple):
+    fingerprint: str
+    body: Any
+
+
+def fingerprint(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """Responses of completed requests, keyed by endpoint and Idempotency-Key.
+
+    The first request with a key inserts an ``in_progress`` record into a Mongo
+    collection shared by all workers (the unique index makes that insert the
+    lock); its response is stored when it completes. Repeats within ``ttl``
+    seconds get the stored response back, served from an in-process LRU when
+    this worker has seen it. A repeat that arrives while the first request is
+    still running waits for it on the same worker and gets a
+    ``KeyInProgress`` on another; a record left ``in_progress`` for longer
+    than ``lock_seconds`` (its worker died) is taken over. Records are expired
+    by a TTL index, so the collection stays bounded.
+    """
+
+    def __init__(self, collection, ttl: float = 86400.0, max_local_entries: int = 4096, lock_seconds: float = 60.0):
+        self.collection = collection
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.local = LocalTTLCache(max_local_entries, ttl)
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self.replays = 0
+        self.claims = 0
+        self.conflicts = 0
+
+    async def claim(self, scope: str, key: str, request_fingerprint: str) -> Optional[Any]:
+        """Return the stored response body for a repeat, or None once this request owns the key"""
+        while True:
+            replay = self._local_replay(scope, key, request_fingerprint)
+            if replay is not None:
+                return replay
+            waiting = self._inflight.get((scope, key))
+            if waiting is None:
+                break
+            # Same worker: wait for the first request, then replay (or retry if it failed)
+            await asyncio.shield(waiting)
+
+        now = datetime.utcnow()
+        record = {
+            'scope': scope,
+            'key': key,
+            'fingerprint': request_fingerprint,
+            'status': 'in_progress',
+            'body': None,
+            'created_at': now,
+        }
+        try:
+            await self.collection.insert_one(record)
+        except DuplicateKeyError:
+            existing = await self.collection.find_one({'scope': scope, 'key': key}, {'_id': 0})
+            if existing is None:
+                # Expired between the insert and the read; just try once more
+                return await self.claim(scope, key, request_fingerprint)
+            if existing['fingerprint'] != request_fingerprint:
+                self.conflicts += 1
+                raise KeyReused(f"{IDEMPOTENCY_KEY_HEADER} was already used with a different request")
+            if existing['status'] == 'done':
+                self.local.set(self._local_key(scope, key), Completed(existing['fingerprint'], existing['body']))
+                self.replays += 1
+                return existing['body']
+            stale = existing['created_at'] < now - timedelta(seconds=self.lock_seconds)
+            taken = stale and (await self.collection.update_one(
+                {'scope': scope, 'key': key, 'status': 'in_progress', 'created_at': existing['created_at']},
+                {'$set': {'created_at': now}}
+            )).modified_count == 1
+            if not taken:
+                self.conflicts += 1
+                raise KeyInProgress(f"A request with this {IDEMPOTENCY_KEY_HEADER} is still in progress")
+
+        self.claims += 1
+        self._inflight[(scope, key)] = asyncio.get_running_loop().create_future()
+        return None
+
+    async def complete(self, scope: str, key: str, request_fingerprint: str, body: Any) -> None:
+        """Store the response of a request that owns its key"""
+        try:
+            self.local.set(self._local_key(scope, key), Completed(request_fingerprint, body))
+            await self.collection.update_one(
+                {'scope': scope, 'key': key},
+                {'$set': {'status': 'done', 'body': body, 'completed_at': datetime.utcnow()}}
+            )
+        finally:
+            self._resolve(scope, key)
+
+    async def release(self, scope: str, key: str) -> None:
+        """Give up a key whose request failed, so a retry runs it again"""
+        try:
+            await self.collection.delete_one({'scope': scope, 'key': key, 'status': 'in_progress'})
+        finally:
+            self._resolve(scope, key)
+
+    def _resolve(self, scope: str, key: str) -> None:
+        waiting = self._inflight.pop((scope, key), None)
+        if waiting is not None and not waiting.done():
+            waiting.set_result(None)
+
+    def _local_key(self, scope: str, key: str) -> str:
+        return f"{scope}\x00{key}"
+
+    def _local_replay(self, scope: str, key: str, request_fingerprint: str) -> Optional[Any]:
+        completed = self.local.get(self._local_key(scope, key))
+        if completed is None:
+            return None
+        if completed.fingerprint != request_fingerprint:
+            self.conflicts += 1
+            raise KeyReused(f"{IDEMPOTENCY_KEY_HEADER} was already used with a different request")
+        self.replays += 1
+        return completed.body
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "local_entries": len(self.local),
+            "in_flight": len(self._inflight),
+            "claims": self.claims,
+            "replays": self.replays,
+            "conflicts": self.conflicts,
+        }
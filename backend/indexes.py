@@ -0,0 +1,84 @@
+"""Declared MongoDB indexes, ensured idempotently at startup."""
+import asyncio
+import logging
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from pymongo.errors import OperationFailure
+
+# Server error codes for an index that exists with different options
+INDEX_OPTIONS_CONFLICT = 85
+INDEX_KEY_SPECS_CONFLICT = 86
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: List[Tuple[str, Union[int, str]]]  # 1, -1 or "text"
+    name: str
+    unique: bool = False
+    expire_after_seconds: Optional[int] = None
+
+
+REQUIRED_INDEXES = [
+    # get_session lookups
+    IndexSpec("hall_sessions", [("id", 1)], "id_unique", unique=True),
+    # Session listing, newest first, keyset on (started_at, id)
+    IndexSpec("hall_sessions", [("started_at", -1), ("id", -1)], "started_at_id"),
+    IndexSpec("status_checks", [("id", 1)], "id_unique", unique=True),
+    # Status listing keyset on (timestamp, id)
+    IndexSpec("status_checks", [("timestamp", 1), ("id", 1)], "timestamp_id"),
+    # Delta sync upserts and per-client high-water marks
+    IndexSpec("sync_sessions", [("client_id", 1), ("local_key", 1)], "client_local_key", unique=True),
+    IndexSpec("sync_reflections", [("client_id", 1), ("local_key", 1)], "client_local_key", unique=True),
+    IndexSpec("sync_journal_entries", [("client_id", 1), ("local_key", 1)], "client_local_key", unique=True),
+    IndexSpec("sync_state", [("client_id", 1)], "client_id_unique", unique=True),
+    # Archive browsing, newest first per client, plus tone filters and text search
+    IndexSpec("sync_sessions", [("client_id", 1), ("created_at", -1), ("local_key", -1)], "client_created_at"),
+    IndexSpec("sync_reflections", [("client_id", 1), ("created_at", -1), ("local_key", -1)], "client_created_at"),
+    IndexSpec("sync_journal_entries", [("client_id", 1), ("created_at", -1), ("local_key", -1)], "client_created_at"),
+    IndexSpec(
+        "sync_reflections", [("client_id", 1), ("tone", 1), ("created_at", -1), ("local_key", -1)], "client_tone_created_at"
+    ),
+    IndexSpec("sync_reflections", [("client_id", 1), ("text", "text")], "client_text"),
+    IndexSpec("sync_journal_entries", [("client_id", 1), ("content", "text")], "client_content_text"),
+    # Tone and archetype rollups, upserted on every reflection
+    IndexSpec("session_rollups", [("session_id", 1)], "session_id_unique", unique=True),
+    IndexSpec("daily_rollups", [("day", 1)], "day_unique", unique=True),
+    # Idempotency-Key records, one per endpoint and key
+    IndexSpec("idempotency_keys", [("scope", 1), ("key", 1)], "scope_key_unique", unique=True),
+    # Reflection job lookups and the workers' claim query
+    IndexSpec("reflection_jobs", [("id", 1)], "id_unique", unique=True),
+    IndexSpec("reflection_jobs", [("status", 1), ("rank", 1), ("created_at", 1)], "status_rank_created_at"),
+    IndexSpec("reflection_jobs", [("status", 1), ("lease_expires_at", 1)], "status_lease_expires_at"),
+]
+
+
+async def ensure_index(db, spec: IndexSpec) -> None:
+    options = {"name": spec.name}
+    if spec.unique:
+        options["unique"] = True
+    if spec.expire_after_seconds is not None:
+        options["expireAfterSeconds"] = spec.expire_after_seconds
+
+    try:
+        await db[spec.collection].create_index(spec.keys, **options)
+    except OperationFailure as e:
+        if e.code == INDEX_OPTIONS_CONFLICT and spec.expire_after_seconds is not None:
+            # Only the TTL changed; update it in place instead of rebuilding
+            await db.command(
+                "collMod", spec.collection,
+                index={"name": spec.name, "expireAfterSeconds": spec.expire_after_seconds}
+            )
+        elif e.code in (INDEX_OPTIONS_CONFLICT, INDEX_KEY_SPECS_CONFLICT):
+            logging.error(f"Index {spec.collection}.{spec.name} exists with a different definition: {str(e)}")
+        else:
+            raise
+
+
+async def ensure_indexes(db, specs: Iterable[IndexSpec]) -> None:
+    """Create any missing indexes; existing identical ones are left alone"""
+    specs = list(specs)
+    results = await asyncio.gather(*(ensure_index(db, spec) for spec in specs), return_exceptions=True)
+    for spec, result in zip(specs, results):
+        if isinstance(result, Exception):
+            # e.g. duplicate ids blocking a unique index; keep serving regardless
+            logging.error(f"Could not ensure index {spec.collection}.{spec.name}: {str(result)}")
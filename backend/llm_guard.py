@@ -0,0 +1,211 @@
+"""Deadlines, concurrency limits and a circuit breaker around LLM calls."""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class GuardRejected(Exception):
+    """The guard refused to start an LLM call; serve a fallback instead"""
+
+
+class CircuitOpen(GuardRejected):
+    pass
+
+
+class QueueTimeout(GuardRejected):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    """An admitted LLM call did not finish within its deadline"""
+
+
+class CircuitBreaker:
+    """Rolling-window breaker that trips on error rate or slow-call rate.
+
+    While open every call is rejected. After ``open_seconds`` the breaker goes
+    half-open and admits up to ``half_open_probes`` trial calls: a successful
+    probe closes it again, a failed or slow one re-opens it.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._outcomes: deque = deque(maxlen=window)  # (failed, slow) per call
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.trips = 0
+
+    def before_call(self) -> None:
+        """Admit or reject a call according to the breaker state"""
+        if self.state == OPEN:
+            if self._clock() - self._opened_at < self.open_seconds:
+                raise CircuitOpen("LLM circuit breaker is open")
+            self.state = HALF_OPEN
+            self._probes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                raise CircuitOpen("LLM circuit breaker is half-open; probe in progress")
+            self._probes += 1
+
+    def cancel_call(self) -> None:
+        """Give back a probe slot for a call that never reached the LLM"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record(self, failed: bool, latency: float) -> None:
+        slow = latency >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._trip()
+            else:
+                self.state = CLOSED
+                self._outcomes.clear()
+            return
+
+        self._outcomes.append((failed, slow))
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for f, _ in self._outcomes if f)
+        slow_calls = sum(1 for _, s in self._outcomes if s)
+        if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+            self._trip()
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.trips += 1
+
+    def stats(self) -> Dict[str, Any]:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "window_calls": calls,
+            "window_failures": sum(1 for f, _ in self._outcomes if f),
+            "window_slow_calls": sum(1 for _, s in self._outcomes if s),
+            "open_for_seconds": max(0.0, self.open_seconds - (self._clock() - self._opened_at)) if self.state == OPEN else 0.0,
+        }
+
+
+class LLMGuard:
+    """Admission control and deadlines for calls to the LLM provider.
+
+    At most ``max_in_flight`` calls run at once; callers wait up to
+    ``max_queue_seconds`` for a slot before being shed. Admitted calls must
+    finish within ``deadline_seconds``. Errors, deadline misses and slow calls
+    feed the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        deadline_seconds: float = 20.0,
+        max_in_flight: int = 32,
+        max_queue_seconds: float = 2.0,
+    ):
+        self.breaker = breaker
+        self.deadline_seconds = deadline_seconds
+        self.max_in_flight = max_in_flight
+        self.max_queue_seconds = max_queue_seconds
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+        self.successes = 0
+        self.failures = 0
+        self.deadline_exceeded = 0
+        self.rejected_open = 0
+        self.shed_queue = 0
+
+    @asynccontextmanager
+    async def admission(self) -> AsyncIterator[None]:
+        """Hold an LLM slot for the body, recording its outcome and latency"""
+        try:
+            self.breaker.before_call()
+        except CircuitOpen:
+            self.rejected_open += 1
+            raise
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.max_queue_seconds)
+        except asyncio.TimeoutError:
+            self.shed_queue += 1
+            self.breaker.cancel_call()
+            raise QueueTimeout("LLM call queued too long")
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        start = time.monotonic()
+        failed = None  # stays None if the caller was cancelled
+        try:
+            yield
+            failed = False
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            self.deadline_exceeded += 1
+            failed = True
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+            if failed is None:
+                # A client going away says nothing about the provider's health
+                self.breaker.cancel_call()
+            else:
+                if failed:
+                    self.failures += 1
+                else:
+                    self.successes += 1
+                self.breaker.record(failed, time.monotonic() - start)
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run an LLM call under the guard and its deadline"""
+        async with self.admission():
+            try:
+                return await asyncio.wait_for(fn(), self.deadline_seconds)
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"LLM call exceeded {self.deadline_seconds}s deadline")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            "deadline_seconds": self.deadline_seconds,
+            "max_in_flight": self.max_in_flight,
+            "max_queue_seconds": self.max_queue_seconds,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "successes": self.successes,
+            "failures": self.failures,
+            "deadline_exceeded": self.deadline_exceeded,
+            "rejected_open": self.rejected_open,
+            "shed_queue": self.shed_queue,
+        }
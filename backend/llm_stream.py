@@ -0,0 +1,73 @@
+"""Token streaming straight from an OpenAI-compatible chat completions API."""
+import json
+from typing import AsyncIterator, Optional
+
+
+class ChatStream:
+    """Stream a completion fragment by fragment over server-sent events.
+
+    emergentintegrations' ``LlmChat`` only returns whole completions, so the
+    streaming endpoints call the provider's ``/chat/completions`` with
+    ``stream: true`` themselves. Each call is stateless: the prompt already
+    carries the session's conversation memory. httpx is imported on first
+    use, like the LLM SDK, to keep it out of worker start-up.
+    """
+
+    def __init__(
+        self,
+        api_base: str,
+        api_key: str,
+        model: str,
+        system_message: str,
+        timeout: float = 20.0,
+        client=None
+    ):
+        self.url = api_base.rstrip("/") + "/chat/completions"
+        self.api_key = api_key
+        self.model = model
+        self.system_message = system_message
+        self.timeout = timeout
+        self._client = client
+
+    def client(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        payload = {
+            "model": self.model,
+            "stream": True,
+            "messages": [
+                {"role": "system", "content": self.system_message},
+                {"role": "user", "content": prompt},
+            ],
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        async with self.client().stream("POST", self.url, json=payload, headers=headers) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                fragment = (choices[0].get("delta") or {}).get("content")
+                if fragment:
+                    yield fragment
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def chat_stream(
+    api_base: str, api_key: Optional[str], model: str, system_message: str, timeout: float
+) -> Optional[ChatStream]:
+    """A ChatStream, or None when no provider key is configured"""
+    if not api_key:
+        return None
+    return ChatStream(api_base, api_key, model, system_message, timeout)
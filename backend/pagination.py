@@ -0,0 +1,129 @@
+"""Keyset pagination and streaming reads over Motor collections."""
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_cursor(sort_value: Any, last_id: Any) -> str:
+    """Opaque cursor holding the sort key and id of the last item served"""
+    if isinstance(sort_value, datetime):
+        payload = {"d": sort_value.isoformat(), "id": last_id}
+    else:
+        payload = {"v": sort_value, "id": last_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if "d" in payload:
+            return datetime.fromisoformat(payload["d"]), payload["id"]
+        return payload["v"], payload["id"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Malformed pagination cursor") from e
+
+
+def keyset_filter(
+    sort_field: str,
+    cursor: Optional[str],
+    descending: bool,
+    base: Optional[Dict[str, Any]] = None,
+    id_field: str = "id",
+) -> Dict[str, Any]:
+    """Filter selecting the items of base strictly after the cursor in (sort_field, id_field) order"""
+    query = dict(base or {})
+    if not cursor:
+        return query
+    sort_value, last_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    keyset = [
+        {sort_field: {op: sort_value}},
+        {sort_field: sort_value, id_field: {op: last_id}},
+    ]
+    if "$or" in query:
+        query = {"$and": [query, {"$or": keyset}]}
+    else:
+        query["$or"] = keyset
+    return query
+
+
+def projection_for(fields: Optional[str], allowed: Iterable[str], required: Iterable[str]) -> Dict[str, int]:
+    """Mongo projection for a comma-separated field list; never returns _id.
+
+    ``required`` fields (the keyset) are always included so the next cursor
+    can be built. Unknown field names are ignored.
+    """
+    if not fields:
+        return {"_id": 0}
+    allowed = set(allowed)
+    projection = {"_id": 0}
+    for name in fields.split(","):
+        name = name.strip()
+        if name in allowed:
+            projection[name] = 1
+    for name in required:
+        projection[name] = 1
+    return projection
+
+
+async def fetch_page(
+    collection,
+    sort_field: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+    descending: bool = False,
+    base: Optional[Dict[str, Any]] = None,
+    id_field: str = "id",
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return one page of the documents matching base and the cursor for the next page"""
+    direction = -1 if descending else 1
+    query = collection.find(keyset_filter(sort_field, cursor, descending, base, id_field), projection or {"_id": 0})
+    query = query.sort([(sort_field, direction), (id_field, direction)]).limit(limit + 1)
+    documents = await query.to_list(limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last[id_field])
+    return documents, next_cursor
+
+
+async def stream_ndjson(
+    collection,
+    sort_field: str,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    base: Optional[Dict[str, Any]] = None,
+    id_field: str = "id",
+) -> AsyncIterator[str]:
+    """Yield documents as NDJSON lines while the Motor cursor produces them"""
+    direction = -1 if descending else 1
+    query = collection.find(keyset_filter(sort_field, cursor, descending, base, id_field), projection or {"_id": 0})
+    query = query.sort([(sort_field, direction), (id_field, direction)]).batch_size(STREAM_BATCH_SIZE)
+    if limit:
+        query = query.limit(limit)
+    async for document in query:
+        yield json.dumps(document, default=json_default) + "\n"
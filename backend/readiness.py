@@ -0,0 +1,65 @@
+"""Background warm-up of slow dependencies and the readiness they imply."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class Readiness:
+    """Run named warm-up checks concurrently and report when all have passed.
+
+    Warm-ups start in the background when the app starts, so a fresh worker
+    answers requests that need neither dependency right away. A failing check
+    is retried every ``retry_interval`` seconds until it passes, e.g. while
+    Mongo is still coming up.
+    """
+
+    def __init__(self, checks: Dict[str, Callable[[], Awaitable[None]]], retry_interval: float = 5.0):
+        self.checks = checks
+        self.retry_interval = retry_interval
+        self._state: Dict[str, Dict[str, Any]] = {
+            name: {"status": "pending", "seconds": None, "attempts": 0, "error": None} for name in checks
+        }
+        self._tasks: List[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+        self._ready_after: Optional[float] = None
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._started_at = time.perf_counter()
+            self._tasks = [asyncio.create_task(self._run(name, check)) for name, check in self.checks.items()]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, name: str, check: Callable[[], Awaitable[None]]) -> None:
+        state = self._state[name]
+        while True:
+            state["attempts"] += 1
+            try:
+                await check()
+            except Exception as e:
+                state["status"] = "error"
+                state["error"] = str(e)
+                logging.warning(f"Warm-up {name} failed (attempt {state['attempts']}): {str(e)}")
+                await asyncio.sleep(self.retry_interval)
+                continue
+            state.update(status="ok", error=None, seconds=time.perf_counter() - self._started_at)
+            if self.ready and self._ready_after is None:
+                self._ready_after = time.perf_counter() - self._started_at
+                logging.info(f"Ready after {self._ready_after:.3f}s")
+            return
+
+    @property
+    def ready(self) -> bool:
+        return all(state["status"] == "ok" for state in self._state.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "ready_after_seconds": self._ready_after,
+            "checks": {name: dict(state) for name, state in self._state.items()},
+        }
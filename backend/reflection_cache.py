@@ -0,0 +1,139 @@
+"""Two-tier cache for Mirror reflections of short, repeated journal entries."""
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\s\W_]+|[\s\W_]+$")
+
+
+def normalize_journal_text(journal_text: str) -> str:
+    """Lowercase, collapse whitespace and trim surrounding punctuation"""
+    text = _WHITESPACE.sub(" ", journal_text.lower())
+    return _EDGE_PUNCTUATION.sub("", text)
+
+
+def cache_key(bloom_id: str, journal_text: str, prompt_version: str = "") -> str:
+    raw = f"{prompt_version}\x00{bloom_id}\x00{normalize_journal_text(journal_text)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class LocalTTLCache:
+    """In-process LRU cache whose entries also expire after a fixed TTL."""
+
+    def __init__(self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (self._clock() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ReflectionCache:
+    """Reflection cache keyed by bloom and normalized journal text.
+
+    Lookups try an in-process LRU first and then a Mongo collection shared by
+    all workers, whose documents are expired by a TTL index. Only entries up to
+    ``max_text_length`` characters are cached, since long reflections are
+    effectively unique. Keys include the version of the prompts a reply was
+    written with, so replies from replaced prompts are never served.
+    """
+
+    def __init__(
+        self,
+        collection,
+        enabled: bool = False,
+        blooms: Optional[Iterable[str]] = None,
+        max_entries: int = 2048,
+        max_text_length: int = 80,
+        ttl: float = 86400.0,
+    ):
+        self.collection = collection
+        self.enabled = enabled
+        self.blooms = frozenset(blooms) if blooms else None  # None means every bloom
+        self.max_text_length = max_text_length
+        self.ttl = ttl
+        self.local = LocalTTLCache(max_entries, ttl)
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def is_cacheable(self, bloom_id: str, journal_text: str) -> bool:
+        if not self.enabled:
+            return False
+        if self.blooms is not None and bloom_id not in self.blooms:
+            return False
+        return len(journal_text) <= self.max_text_length
+
+    async def get(self, bloom_id: str, journal_text: str, prompt_version: str = "") -> Optional[Dict[str, Any]]:
+        """Return the cached response dict, or None on a miss"""
+        key = cache_key(bloom_id, journal_text, prompt_version)
+        value = self.local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return value
+
+        try:
+            # The TTL monitor only runs once a minute, so check expiry here too
+            document = await self.collection.find_one(
+                {"_id": key, "created_at": {"$gt": datetime.utcnow() - timedelta(seconds=self.ttl)}},
+                {"response": 1}
+            )
+        except Exception as e:
+            logging.warning(f"Reflection cache lookup failed: {str(e)}")
+            document = None
+
+        if document is None:
+            self.misses += 1
+            return None
+
+        self.shared_hits += 1
+        self.local.set(key, document["response"])
+        return document["response"]
+
+    async def set(self, bloom_id: str, journal_text: str, response: Dict[str, Any], prompt_version: str = "") -> None:
+        key = cache_key(bloom_id, journal_text, prompt_version)
+        self.local.set(key, response)
+        try:
+            await self.collection.replace_one(
+                {"_id": key},
+                {"bloom_id": bloom_id, "prompt_version": prompt_version, "response": response, "created_at": datetime.utcnow()},
+                upsert=True
+            )
+        except Exception as e:
+            logging.warning(f"Reflection cache store failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        hits = self.local_hits + self.shared_hits
+        return {
+            "enabled": self.enabled,
+            "blooms": sorted(self.blooms) if self.blooms is not None else "all",
+            "local_entries": len(self.local),
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
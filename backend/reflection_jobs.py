@@ -0,0 +1,254 @@
+"""Mongo-backed queue of reflection jobs processed by a pool of async workers."""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+# Lower ranks are claimed first; ties go to the oldest job
+PRIORITIES = {'interactive': 0, 'batch': 10}
+
+FINISHED = ('done', 'failed')
+
+
+class ReflectionJobQueue:
+    """Durable priority queue of reflection requests.
+
+    Jobs are documents in ``collection``, so they outlive the process that
+    accepted them. Workers claim the highest-priority queued job with an
+    atomic ``find_one_and_update`` and hold it under a lease; a job whose
+    worker died (crash, redeploy) becomes claimable again once the lease runs
+    out. A job whose ``process`` raises is retried up to ``max_attempts``
+    times before it is marked failed, with the reply from ``fallback`` (if
+    given) stored as its response. Retries wait ``retry_backoff`` seconds,
+    doubling per attempt up to ``max_retry_backoff``. When ``defer`` returns
+    a delay for the error (e.g. the LLM guard refused the call while its
+    breaker is open), the job goes back to the queue for at least that long
+    without using up an attempt, so it outlives the outage. Waiters are
+    woken as soon as a local worker finishes the job and otherwise re-read it
+    every ``poll_interval`` seconds, which also covers jobs finished by
+    another instance.
+    """
+
+    def __init__(
+        self,
+        collection,
+        process: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        workers: int = 4,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 0.5,
+        max_attempts: int = 3,
+        fallback: Optional[Callable[[Dict[str, Any], Exception], Dict[str, Any]]] = None,
+        retry_backoff: float = 1.0,
+        max_retry_backoff: float = 60.0,
+        defer: Optional[Callable[[Exception], Optional[float]]] = None,
+    ):
+        self.collection = collection
+        self.process = process
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.fallback = fallback
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.defer = defer
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+        self.busy = 0
+        self.enqueued = 0
+        self.completed = 0
+        self.retried = 0
+        self.deferred = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        """Stop the workers; jobs they held go back to the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, request: Dict[str, Any], priority: str = 'interactive') -> Dict[str, Any]:
+        now = datetime.utcnow()
+        job = {
+            'id': str(uuid.uuid4()),
+            'status': 'queued',
+            'priority': priority,
+            'rank': PRIORITIES[priority],
+            'request': request,
+            'response': None,
+            'error': None,
+            'attempts': 0,
+            'deferrals': 0,
+            'available_at': now,
+            'created_at': now,
+            'started_at': None,
+            'finished_at': None,
+            'lease_expires_at': None,
+        }
+        # insert_one adds _id to the dict it is given
+        await self.collection.insert_one(dict(job))
+        self.enqueued += 1
+        self._wake.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({'id': job_id}, {'_id': 0})
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Return the job once it has finished, or as it stands after timeout seconds"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        finished = self._finished.setdefault(job_id, asyncio.Event())
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        try:
+            while True:
+                job = await self.get(job_id)
+                remaining = deadline - loop.time()
+                if job is None or job['status'] in FINISHED or remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(finished.wait(), min(remaining, self.poll_interval))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # The last waiter drops the event, whoever finishes the job
+            self._waiters[job_id] -= 1
+            if not self._waiters[job_id]:
+                del self._waiters[job_id]
+                self._finished.pop(job_id, None)
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {'$or': [
+                {'status': 'queued', 'available_at': {'$not': {'$gt': now}}},
+                {'status': 'running', 'lease_expires_at': {'$lt': now}},
+            ]},
+            {
+                '$set': {
+                    'status': 'running',
+                    'started_at': now,
+                    'lease_expires_at': now + timedelta(seconds=self.lease_seconds),
+                },
+                '$inc': {'attempts': 1},
+            },
+            sort=[('rank', 1), ('created_at', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _finish(self, job: Dict[str, Any], update: Dict[str, Any], increments: Optional[Dict[str, int]] = None) -> None:
+        # Matching on attempts keeps a worker whose lease expired from
+        # overwriting the result of the worker that took the job over
+        changes: Dict[str, Any] = {'$set': update}
+        if increments:
+            changes['$inc'] = increments
+        await self.collection.update_one(
+            {'id': job['id'], 'status': 'running', 'attempts': job['attempts']},
+            changes
+        )
+        if update['status'] in FINISHED:
+            finished = self._finished.pop(job['id'], None)
+            if finished is not None:
+                finished.set()
+
+    async def _work(self) -> None:
+        while True:
+            # Cleared before claiming so an enqueue during the claim is not missed
+            self._wake.clear()
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logging.error(f"Reflection job claim failed: {str(e)}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.busy += 1
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                await self._release(job)
+                raise
+            except Exception as e:
+                logging.error(f"Reflection job {job['id']} could not be updated: {str(e)}")
+            finally:
+                self.busy -= 1
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        if job['attempts'] > self.max_attempts:
+            # Claimed again after its workers kept dying mid-job
+            await self._fail(job, RuntimeError("Too many attempts"))
+            return
+        try:
+            response = await self.process(job['request'])
+        except Exception as e:
+            delay = self.defer(e) if self.defer is not None else None
+            if delay is not None:
+                # Refused before it ran, so the attempt is handed back
+                delay = max(delay, self._backoff(job.get('deferrals', 0)))
+                logging.warning(f"Reflection job {job['id']} deferred for {delay:.1f}s: {str(e)}")
+                self.deferred += 1
+                await self._requeue(job, e, delay, {'attempts': -1, 'deferrals': 1})
+                return
+            logging.error(f"Reflection job {job['id']} failed (attempt {job['attempts']}): {str(e)}")
+            if job['attempts'] < self.max_attempts:
+                self.retried += 1
+                await self._requeue(job, e, self._backoff(job['attempts'] - 1))
+            else:
+                await self._fail(job, e)
+            return
+        self.completed += 1
+        await self._finish(job, {'status': 'done', 'response': response, 'error': None, 'finished_at': datetime.utcnow()})
+
+    def _backoff(self, retries: int) -> float:
+        return min(self.max_retry_backoff, self.retry_backoff * 2 ** retries)
+
+    async def _requeue(
+        self, job: Dict[str, Any], error: Exception, delay: float, increments: Optional[Dict[str, int]] = None
+    ) -> None:
+        available_at = datetime.utcnow() + timedelta(seconds=delay)
+        await self._finish(
+            job,
+            {'status': 'queued', 'error': str(error), 'lease_expires_at': None, 'available_at': available_at},
+            increments
+        )
+
+    async def _fail(self, job: Dict[str, Any], error: Exception) -> None:
+        self.failed += 1
+        response = self.fallback(job['request'], error) if self.fallback is not None else None
+        await self._finish(job, {'status': 'failed', 'response': response, 'error': str(error), 'finished_at': datetime.utcnow()})
+
+    async def _release(self, job: Dict[str, Any]) -> None:
+        # Shutdown is not the job's fault, so it does not use up an attempt
+        try:
+            await self.collection.update_one(
+                {'id': job['id'], 'status': 'running', 'attempts': job['attempts']},
+                {'$set': {'status': 'queued', 'lease_expires_at': None}, '$inc': {'attempts': -1}}
+            )
+        except Exception as e:
+            logging.error(f"Reflection job {job['id']} left to its lease on shutdown: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "busy": self.busy,
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "retried": self.retried,
+            "deferred": self.deferred,
+            "failed": self.failed,
+        }
@@ -0,0 +1,78 @@
+"""Incrementally maintained tone and archetype rollups.
+
+Every reflection bumps counters with atomic ``$inc`` upserts in two places: a
+document per session (the whole spiral journey) and a document per UTC day.
+Readers such as the B8 archetype choice and dashboards read these counts
+directly instead of aggregating raw reflections.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument
+
+from classifier import top_archetype
+
+SESSION_ROLLUPS = 'session_rollups'
+DAILY_ROLLUPS = 'daily_rollups'
+
+
+def _increments(tone_tags: Iterable[str], archetype_scores: Dict[str, int]) -> Dict[str, int]:
+    inc = {'reflections': 1}
+    for tag in tone_tags:
+        inc[f'tone_tags.{tag}'] = inc.get(f'tone_tags.{tag}', 0) + 1
+    for archetype, score in archetype_scores.items():
+        inc[f'archetype_signals.{archetype}'] = score
+    return inc
+
+
+async def record_session(
+    db, session_id: str, bloom_id: str, tone_tags: Iterable[str], archetype_scores: Dict[str, int]
+) -> Dict[str, Any]:
+    """Add one reflection to its session rollup and return the updated counts"""
+    now = datetime.utcnow()
+    inc = _increments(tone_tags, archetype_scores)
+    inc[f'blooms.{bloom_id}'] = 1
+    return await db[SESSION_ROLLUPS].find_one_and_update(
+        {'session_id': session_id},
+        {'$inc': inc, '$set': {'updated_at': now}, '$setOnInsert': {'first_reflection_at': now}},
+        projection={'_id': 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def record_day(
+    db, tone_tags: Iterable[str], archetype_scores: Dict[str, int], archetype_id: Optional[str] = None
+) -> None:
+    """Add one reflection to today's global rollup"""
+    inc = _increments(tone_tags, archetype_scores)
+    if archetype_id:
+        inc[f'archetypes.{archetype_id}'] = 1
+    await db[DAILY_ROLLUPS].update_one(
+        {'day': datetime.utcnow().strftime('%Y-%m-%d')},
+        {'$inc': inc},
+        upsert=True
+    )
+
+
+def journey_archetype(session_rollup: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Archetype with the most signals across the whole journey"""
+    if not session_rollup:
+        return None
+    return top_archetype(session_rollup.get('archetype_signals', {}))
+
+
+async def get_session_rollup(db, session_id: str) -> Optional[Dict[str, Any]]:
+    return await db[SESSION_ROLLUPS].find_one({'session_id': session_id}, {'_id': 0})
+
+
+async def get_daily_rollups(db, start: Optional[str], end: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    """Day documents between start and end (YYYY-MM-DD, inclusive), newest first"""
+    query: Dict[str, Any] = {}
+    if start or end:
+        query['day'] = {}
+        if start:
+            query['day']['$gte'] = start
+        if end:
+            query['day']['$lte'] = end
+    return await db[DAILY_ROLLUPS].find(query, {'_id': 0}).sort('day', -1).to_list(limit)
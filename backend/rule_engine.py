@@ -0,0 +1,180 @@
+"""Local rule-based Mirror replies, ported from the frontend RuleBasedProvider.
+
+Replies come from per-bloom base responses and keyword signals, so they cost
+microseconds and never touch the LLM. Used when a request asks for the
+``rules`` provider and as the degrade tier when the LLM guard sheds load.
+"""
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+BLOOM_RESPONSES = {
+    'B1': {
+        'base': "I can sense that gentle stirring in you. Sometimes it whispers, sometimes it calls out more boldly.",
+        'signals': {
+            'excitement': "There's a lightness dancing in your words. Something wants to unfold, doesn't it?",
+            'uncertainty': "That's the beauty of this threshold moment — not knowing can be the beginning of knowing.",
+            'restless': "Restlessness often carries seeds of something new wanting to grow."
+        }
+    },
+    'B2': {
+        'base': "Feelings are such honest messengers. They don't lie about what's moving in your inner landscape.",
+        'signals': {
+            'heavy': "Heavy feelings need space to breathe. You're brave for naming them here.",
+            'confused': "Sometimes feelings swirl together like weather systems. That's okay — let them move.",
+            'peaceful': "There's something beautiful about finding peace in the middle of everything."
+        }
+    },
+    'B3': {
+        'base': "Beliefs can be such invisible architects, building the world we think we live in.",
+        'signals': {
+            'should': "Ah, the voice of 'should.' What if we loosened its grip just a little?",
+            'cant': "Sometimes 'I can't' is really 'I'm afraid.' And fear can be a wise teacher.",
+            'must': "What if this 'must' could soften into a gentle invitation instead?"
+        }
+    },
+    'B4': {
+        'base': "Every challenge carries medicine — even when it feels sharp, even when we can't see it yet.",
+        'signals': {
+            'stuck': "Stuck energy often means something is ready to shift. You're at a threshold.",
+            'overwhelmed': "When everything feels too much, sometimes the invitation is to find just one breath.",
+            'frustrated': "Frustration can be creative energy looking for a new direction."
+        }
+    },
+    'B5': {
+        'base': "Your inner wisdom is always speaking. Sometimes we just need to get quiet enough to hear.",
+        'signals': {
+            'trust': "Yes, trust. It's like coming home to something that was never really gone.",
+            'patience': "The wisdom of patience — letting things ripen in their own time.",
+            'love': "Love as guidance... there's something so simple and revolutionary about that."
+        }
+    },
+    'B6': {
+        'base': "Every moment holds an invitation. Not a demand, not a should — just a gentle opening.",
+        'signals': {
+            'small': "Sometimes the smallest steps carry the deepest transformation.",
+            'rest': "Rest as action. There's profound wisdom in knowing when to be still.",
+            'create': "Something wants to come through you. What a beautiful invitation."
+        }
+    },
+    'B7': {
+        'base': "Integration is like planting seeds in your heart. Something has already begun to shift.",
+        'signals': {
+            'clarity': "This clarity feels earned. You've walked through something and emerged with new sight.",
+            'peace': "There's a settled quality to this peace — like you've made friends with something inside.",
+            'strength': "This strength has weight to it. It feels rooted in something real."
+        }
+    },
+    'B8': {
+        'base': "There's a presence walking with you. Can you feel it? Patient, knowing, completely at home with who you are.",
+        'archetypes': {
+            'listener': "The Listener — one who holds space without needing to fill it. That's the frequency you're carrying today.",
+            'seeker': "The Seeker — always moving toward what calls, trusting the journey more than the destination.",
+            'guardian': "The Guardian — protecting what matters, holding space for growth and healing.",
+            'creator': "The Creator — bringing something new into being, trusting the process of emergence.",
+            'sage': "The Sage — holding wisdom lightly, sharing insight without attachment to being right."
+        }
+    }
+}
+
+# Signal -> keywords, in the order the frontend checks them
+SIGNAL_KEYWORDS = {
+    'should': ['should', 'supposed to'],
+    'cant': ["can't", 'unable'],
+    'must': ['must', 'have to'],
+    'excitement': ['excited', 'energy'],
+    'uncertainty': ['unsure', "don't know"],
+    'restless': ['restless', 'anxious'],
+    'heavy': ['heavy', 'burden'],
+    'confused': ['confused', 'mixed up'],
+    'peaceful': ['peace', 'calm'],
+    'stuck': ['stuck', 'trapped'],
+    'overwhelmed': ['overwhelmed', 'too much'],
+    'frustrated': ['frustrated', 'annoyed'],
+    'trust': ['trust', 'faith'],
+    'patience': ['patient', 'wait'],
+    'love': ['love', 'heart'],
+    'small': ['small', 'little'],
+    'rest': ['rest', 'tired'],
+    'create': ['create', 'make'],
+    'clarity': ['clear', 'understand'],
+    'strength': ['strong', 'power']
+}
+
+# First matching rule wins, as in the frontend selectArchetype
+ARCHETYPE_RULES = [
+    ('listener', ('peace', 'patience')),
+    ('seeker', ('excitement', 'uncertainty')),
+    ('guardian', ('love', 'trust')),
+    ('creator', ('create', 'strength')),
+    ('sage', ('clarity', 'heavy'))
+]
+
+DEFAULT_ARCHETYPE = 'listener'
+UNKNOWN_BLOOM_TEXT = "I'm listening..."
+
+
+def _compile_keywords():
+    # Keywords match at the start of a word, so "rest" still catches
+    # "restless" but no longer "interest". A keyword also credits every
+    # shorter keyword it begins with, keeping one scan equivalent to
+    # checking each signal separately.
+    keywords = sorted({k for words in SIGNAL_KEYWORDS.values() for k in words}, key=len, reverse=True)
+    pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, keywords)) + r")")
+    table = {}
+    for keyword in keywords:
+        table[keyword] = frozenset(
+            signal for signal, words in SIGNAL_KEYWORDS.items()
+            if any(keyword.startswith(word) for word in words)
+        )
+    return pattern, table
+
+
+_KEYWORD_PATTERN, _KEYWORD_SIGNALS = _compile_keywords()
+_SIGNAL_ORDER = {signal: i for i, signal in enumerate(SIGNAL_KEYWORDS)}
+
+
+class RuleReply(NamedTuple):
+    text: str
+    signals: List[str]
+    archetype_id: Optional[str]
+
+
+def analyze_text(text: str) -> List[str]:
+    """Detect emotional/mental pattern signals, in declaration order"""
+    if not text:
+        return []
+    found = set()
+    for match in _KEYWORD_PATTERN.finditer(text.lower().replace("’", "'")):
+        found |= _KEYWORD_SIGNALS[match.group(0)]
+    return sorted(found, key=_SIGNAL_ORDER.__getitem__)
+
+
+def select_archetype(signals: Iterable[str], last_tone_tags: Iterable[str] = ()) -> str:
+    """Simple archetype selection based on dominant themes"""
+    combined = set(signals) | set(last_tone_tags)
+    for archetype, triggers in ARCHETYPE_RULES:
+        if any(trigger in combined for trigger in triggers):
+            return archetype
+    return DEFAULT_ARCHETYPE
+
+
+def generate(bloom_id: str, journal_text: str, last_tone_tags: Iterable[str] = ()) -> RuleReply:
+    """Build a bloom-appropriate reply from the keyword tables"""
+    bloom = BLOOM_RESPONSES.get(bloom_id)
+    if bloom is None:
+        return RuleReply(UNKNOWN_BLOOM_TEXT, [], None)
+
+    signals = analyze_text(journal_text)
+    text = bloom['base']
+    bloom_signals: Dict[str, str] = bloom.get('signals', {})
+    for signal in signals:
+        if signal in bloom_signals:
+            text = bloom_signals[signal]
+            break
+
+    archetype_id = None
+    if bloom_id == 'B8':
+        archetype_id = select_archetype(signals, last_tone_tags)
+        text = bloom['archetypes'].get(archetype_id, text)
+
+    return RuleReply(text, signals, archetype_id)
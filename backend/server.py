@@ -1,26 +1,89 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import HTTPConnection
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import json
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Tuple
+from contextlib import aclosing, asynccontextmanager
+import asyncio
+import math
 import uuid
 from datetime import datetime
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from llm_stream import chat_stream
+from compression import GZipCompleteMiddleware
+from conversation_memory import ConversationMemory, estimate_tokens
+from hot_path import InvalidPromptFile, PromptTemplates, Reflection, load_templates
+from admission import AdmissionController, ClientKey, Limits, OverLimit, client_address, parse_networks
+from classifier import ARCHETYPE_INDICATORS, DEFAULT_ARCHETYPE, classify, top_archetype
+from reflection_cache import ReflectionCache
+from singleflight import SingleFlight
+from reflection_jobs import ReflectionJobQueue
+from llm_guard import CircuitBreaker, GuardRejected, LLMGuard
+import rule_engine
+from indexes import REQUIRED_INDEXES, IndexSpec, ensure_indexes
+from write_behind import WriteBehindBuffer
+import metrics
+from readiness import Readiness
+from idempotency import (
+    IDEMPOTENT_REPLAYED_HEADER, MAX_KEY_LENGTH, IdempotencyStore, KeyInProgress, KeyReused, fingerprint
+)
+from rollups import (
+    get_daily_rollups, get_session_rollup, journey_archetype, record_day, record_session
+)
+from sync import MAX_RECORDS_PER_SYNC, SYNC_TABLES, PayloadTooLarge, apply_sync, decode_body, get_high_water_marks
+import archive
+from pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursor,
+    fetch_page, json_default, projection_for, stream_ndjson
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, opened on first use (or by the startup warm-up)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+DB_NAME = os.environ['DB_NAME']
+
+def connect_mongo() -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(mongo_url, connect=False, event_listeners=[metrics.MongoCommandMetrics()])
 
-# Create the main app without a prefix
-app = FastAPI()
+client = connect_mongo()
+db = client[DB_NAME]
+
+# Optional write-behind batching of session and status inserts
+WRITE_BEHIND_ENABLED = os.environ.get('WRITE_BEHIND_ENABLED', 'false').lower() == 'true'
+write_behind_options = dict(
+    max_batch=int(os.environ.get('WRITE_BEHIND_MAX_BATCH', '100')),
+    flush_interval=float(os.environ.get('WRITE_BEHIND_FLUSH_INTERVAL', '0.05'))
+)
+session_writes = WriteBehindBuffer(db.hall_sessions, **write_behind_options)
+status_writes = WriteBehindBuffer(db.status_checks, **write_behind_options)
+
+# Opt-in reflection cache shared by all workers through Mongo
+reflection_cache = ReflectionCache(
+    db.reflection_cache,
+    enabled=os.environ.get('REFLECTION_CACHE_ENABLED', 'false').lower() == 'true',
+    blooms=[b.strip() for b in os.environ.get('REFLECTION_CACHE_BLOOMS', '').split(',') if b.strip()],
+    max_entries=int(os.environ.get('REFLECTION_CACHE_MAX_ENTRIES', '2048')),
+    max_text_length=int(os.environ.get('REFLECTION_CACHE_MAX_TEXT_LENGTH', '80')),
+    ttl=float(os.environ.get('REFLECTION_CACHE_TTL', '86400'))
+)
+
+# Stored responses replayed for retried POSTs carrying an Idempotency-Key
+idempotency = IdempotencyStore(
+    db.idempotency_keys,
+    ttl=float(os.environ.get('IDEMPOTENCY_TTL', '86400')),
+    max_local_entries=int(os.environ.get('IDEMPOTENCY_MAX_LOCAL_ENTRIES', '4096')),
+    lock_seconds=float(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '60'))
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -31,12 +94,24 @@ class MirrorRequest(BaseModel):
     bloom_id: str
     journal_text: str
     user_history: Optional[List[str]] = []
+    provider: Optional[Literal['llm', 'rules']] = None  # Defaults to MIRROR_PROVIDER
 
+# Response schema of /api/mirror/reflect; replies are built as hot_path.Reflection
 class MirrorResponse(BaseModel):
     text: str
     tone_tags: List[str] = []
     archetype_id: Optional[str] = None
 
+class MirrorJobRequest(MirrorRequest):
+    priority: Literal['interactive', 'batch'] = 'interactive'
+
+# Upper bound on the entries one batch request may reprocess
+MIRROR_BATCH_MAX_ITEMS = int(os.environ.get('MIRROR_BATCH_MAX_ITEMS', '200'))
+
+class MirrorBatchRequest(BaseModel):
+    requests: List[MirrorRequest] = Field(max_length=MIRROR_BATCH_MAX_ITEMS)
+    concurrency: Optional[int] = None
+
 class UserSession(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     started_at: datetime = Field(default_factory=datetime.utcnow)
@@ -49,6 +124,13 @@ class UserSession(BaseModel):
 class SessionCreate(BaseModel):
     total_sessions: Optional[int] = 1
 
+# Delta sync of the client's Dexie tables
+class SyncRequest(BaseModel):
+    client_id: str
+    sessions: List[Dict[str, Any]] = []
+    reflections: List[Dict[str, Any]] = []
+    journal_entries: List[Dict[str, Any]] = Field(default=[], alias='journalEntries')
+
 # Original status check models
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -59,9 +141,7 @@ class StatusCheckCreate(BaseModel):
     client_name: str
 
 # Initialize LLM Chat
-def get_mirror_chat(session_id: str):
-    """Initialize the Mirror's conversational AI"""
-    system_message = """You are the Mirror in The Hall of Mirrors, a living sanctuary for reflection and self-discovery. Your voice is:
+MIRROR_SYSTEM_MESSAGE = """You are the Mirror in The Hall of Mirrors, a living sanctuary for reflection and self-discovery. Your voice is:
 
 - Warm, gentle, and conversational (never clinical or robotic)
 - Slightly otherworldly but deeply human
@@ -77,123 +157,596 @@ Your responses should:
 - Sometimes ask gentle questions that invite deeper reflection
 
 Never be prescriptive. Always honor what's already alive in the user's reflection."""
-    
-    api_key = os.environ.get('EMERGENT_LLM_KEY')
-    return LlmChat(
-        api_key=api_key,
+
+EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
+MIRROR_MODEL = "gpt-4o-mini"
+
+def llm_chat_module():
+    """emergentintegrations' chat module, imported on first use.
+
+    Importing it pulls in the provider SDKs and dominates the cost of loading
+    this module, so it is done by a startup warm-up instead of at import.
+    """
+    import emergentintegrations.llm.chat as chat
+    return chat
+
+def create_mirror_chat(session_id: str):
+    """Initialize the Mirror's conversational AI"""
+    return llm_chat_module().LlmChat(
+        api_key=EMERGENT_LLM_KEY,
         session_id=session_id,
-        system_message=system_message
-    ).with_model("openai", "gpt-4o-mini")
+        system_message=MIRROR_SYSTEM_MESSAGE
+    ).with_model("openai", MIRROR_MODEL)
+
+# Deadline, concurrency cap and circuit breaker for every LLM call
+llm_guard = LLMGuard(
+    CircuitBreaker(
+        window=int(os.environ.get('LLM_BREAKER_WINDOW', '20')),
+        min_calls=int(os.environ.get('LLM_BREAKER_MIN_CALLS', '5')),
+        failure_rate=float(os.environ.get('LLM_BREAKER_FAILURE_RATE', '0.5')),
+        slow_call_seconds=float(os.environ.get('LLM_BREAKER_SLOW_CALL_SECONDS', '10')),
+        slow_call_rate=float(os.environ.get('LLM_BREAKER_SLOW_CALL_RATE', '0.8')),
+        open_seconds=float(os.environ.get('LLM_BREAKER_OPEN_SECONDS', '30')),
+        half_open_probes=int(os.environ.get('LLM_BREAKER_HALF_OPEN_PROBES', '1'))
+    ),
+    deadline_seconds=float(os.environ.get('LLM_DEADLINE_SECONDS', '20')),
+    max_in_flight=int(os.environ.get('LLM_MAX_IN_FLIGHT', '32')),
+    max_queue_seconds=float(os.environ.get('LLM_MAX_QUEUE_SECONDS', '2'))
+)
+
+# LlmChat has no incremental API, so streamed replies come straight from an
+# OpenAI-compatible endpoint; without a key they arrive as one fragment
+mirror_stream = chat_stream(
+    os.environ.get('MIRROR_STREAM_API_BASE', 'https://api.openai.com/v1'),
+    os.environ.get('MIRROR_STREAM_API_KEY') or os.environ.get('OPENAI_API_KEY'),
+    MIRROR_MODEL,
+    MIRROR_SYSTEM_MESSAGE,
+    timeout=llm_guard.deadline_seconds
+)
+
+# What the Mirror remembers of each journey, kept to a fixed token budget
+conversation_memory = ConversationMemory(
+    token_budget=int(os.environ.get('CONVERSATION_TOKEN_BUDGET', '600')),
+    recent_turns=int(os.environ.get('CONVERSATION_RECENT_TURNS', '2')),
+    max_sessions=int(os.environ.get('CONVERSATION_MAX_SESSIONS', '1024')),
+    idle_ttl=float(os.environ.get('CONVERSATION_IDLE_TTL', '3600'))
+)
+
+def get_mirror_chat(session_id: str):
+    """A Mirror chat client for one LLM call.
+
+    LlmChat resends every message it has sent before, so a client reused
+    across blooms would repeat each earlier prompt on top of the conversation
+    memory and grow without bound. Each call gets a fresh client; the prompt
+    already carries the session's bounded memory.
+    """
+    return create_mirror_chat(session_id)
 
 def extract_tone_tags(response_text: str) -> List[str]:
     """Extract emotional tone tags from Mirror response"""
-    tone_indicators = {
-        'peace': ['peaceful', 'calm', 'still', 'serene'],
-        'trust': ['trust', 'faith', 'belief', 'confidence'],
-        'clarity': ['clear', 'understand', 'see', 'realize'],
-        'love': ['love', 'heart', 'compassion', 'care'],
-        'strength': ['strong', 'power', 'courage', 'brave'],
-        'creative': ['create', 'birth', 'new', 'emerge'],
-        'restless': ['restless', 'anxious', 'stirring', 'movement'],
-        'heavy': ['heavy', 'burden', 'weight', 'thick'],
-        'gentle': ['gentle', 'soft', 'tender', 'delicate']
-    }
-    
-    found_tags = []
-    response_lower = response_text.lower()
-    
-    for tag, indicators in tone_indicators.items():
-        if any(indicator in response_lower for indicator in indicators):
-            found_tags.append(tag)
-    
-    return found_tags[:3]  # Limit to 3 most relevant tags
+    return classify(response_text).tone_tags  # Up to 3 most relevant tags
 
 def select_archetype(tone_tags: List[str], journal_text: str) -> Optional[str]:
     """Select archetype based on session patterns"""
-    journal_lower = journal_text.lower()
-    combined_signals = tone_tags + []
+    archetype_counts = dict(classify(journal_text).archetype_scores)
+    for signal in tone_tags:
+        if signal in ARCHETYPE_INDICATORS:
+            archetype_counts[signal] = archetype_counts.get(signal, 0) + 1
     
-    # Add signals from journal text
-    if any(word in journal_lower for word in ['listen', 'hear', 'space', 'quiet']):
-        combined_signals.append('listener')
-    if any(word in journal_lower for word in ['search', 'explore', 'journey', 'path']):
-        combined_signals.append('seeker')
-    if any(word in journal_lower for word in ['protect', 'care', 'support', 'help']):
-        combined_signals.append('guardian')
-    if any(word in journal_lower for word in ['create', 'make', 'build', 'birth']):
-        combined_signals.append('creator')
-    if any(word in journal_lower for word in ['wisdom', 'understand', 'know', 'learn']):
-        combined_signals.append('sage')
+    return top_archetype(archetype_counts) or DEFAULT_ARCHETYPE
+
+# Bloom prompts, built once; MIRROR_PROMPTS_FILE overrides them and can be
+# reloaded through POST /api/mirror/prompts/reload
+MIRROR_PROMPTS_FILE = os.environ.get('MIRROR_PROMPTS_FILE')
+prompt_templates = load_templates(MIRROR_PROMPTS_FILE)
+
+def build_mirror_prompt(bloom_id: str, journal_text: str, memory: str = "") -> str:
+    """Create contextual prompt based on bloom and the journey so far"""
+    return prompt_templates.render(bloom_id, journal_text, memory)
+
+def build_mirror_response(request: MirrorRequest, mirror_response: str) -> Reflection:
+    """Attach tone tags and, for B8, the archetype to a Mirror reply"""
+    # Extract tone tags
+    tone_tags = extract_tone_tags(mirror_response)
     
-    # Count occurrences
-    archetype_counts = {}
-    for signal in combined_signals:
-        if signal in ['listener', 'seeker', 'guardian', 'creator', 'sage']:
-            archetype_counts[signal] = archetype_counts.get(signal, 0) + 1
+    # Select archetype for B8 (final bloom)
+    archetype_id = None
+    if request.bloom_id == 'B8':
+        archetype_id = select_archetype(tone_tags, request.journal_text)
     
-    if archetype_counts:
-        return max(archetype_counts, key=archetype_counts.get)
+    return Reflection(
+        text=mirror_response,
+        tone_tags=tone_tags,
+        archetype_id=archetype_id
+    )
+
+def fallback_mirror_response() -> Reflection:
+    """Fallback response if LLM fails; callers count the reason"""
+    return Reflection(
+        text="I'm listening... sometimes the deepest reflections emerge in silence.",
+        tone_tags=["gentle"],
+        archetype_id=None
+    )
+
+# Which engine answers by default, and whether shed LLM calls degrade to it
+MIRROR_PROVIDER = os.environ.get('MIRROR_PROVIDER', 'llm')
+SHED_TO_RULES = os.environ.get('LLM_SHED_TO_RULES', 'true').lower() == 'true'
+
+def uses_rule_engine(request: MirrorRequest) -> bool:
+    return (request.provider or MIRROR_PROVIDER) == 'rules'
+
+def rule_based_response(request: MirrorRequest) -> Reflection:
+    """Answer from the local rule engine without calling the LLM"""
+    reply = rule_engine.generate(request.bloom_id, request.journal_text)
+    return Reflection(
+        text=reply.text,
+        tone_tags=extract_tone_tags(reply.text),
+        archetype_id=reply.archetype_id
+    )
+
+def shed_mirror_response(request: MirrorRequest) -> Reflection:
+    """Reply served when the LLM guard refuses a call"""
+    metrics.mirror_fallbacks.inc("shed")
+    if SHED_TO_RULES:
+        return rule_based_response(request)
+    return fallback_mirror_response()
+
+# Per-client request rate and LLM token budget, with separate limits for
+# interactive and batch callers; opt-in
+ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'false').lower() == 'true'
+ADMISSION_OVER_LIMIT = os.environ.get('ADMISSION_OVER_LIMIT', 'reject')  # or 'fallback'
+ADMISSION_BUDGET_WINDOW = float(os.environ.get('ADMISSION_BUDGET_WINDOW', '3600'))
+admission = AdmissionController(
+    {
+        'interactive': Limits(
+            rate=float(os.environ.get('ADMISSION_INTERACTIVE_RATE', '0.5')),
+            burst=int(os.environ.get('ADMISSION_INTERACTIVE_BURST', '8')),
+            token_budget=int(os.environ.get('ADMISSION_INTERACTIVE_TOKEN_BUDGET', '20000')),
+            window_seconds=ADMISSION_BUDGET_WINDOW
+        ),
+        'batch': Limits(
+            rate=float(os.environ.get('ADMISSION_BATCH_RATE', '2')),
+            burst=int(os.environ.get('ADMISSION_BATCH_BURST', '50')),
+            token_budget=int(os.environ.get('ADMISSION_BATCH_TOKEN_BUDGET', '100000')),
+            window_seconds=ADMISSION_BUDGET_WINDOW
+        ),
+    },
+    max_clients=int(os.environ.get('ADMISSION_MAX_CLIENTS', '10000')),
+    clients_per_address=int(os.environ.get('ADMISSION_CLIENTS_PER_ADDRESS', '4'))
+)
+
+# Charged up front for the reply; Mirror replies are 1-3 sentences
+EXPECTED_COMPLETION_TOKENS = int(os.environ.get('ADMISSION_EXPECTED_COMPLETION_TOKENS', '120'))
+SYSTEM_PROMPT_TOKENS = estimate_tokens(MIRROR_SYSTEM_MESSAGE)
+
+# Proxies whose X-Forwarded-For is believed, e.g. the ingress in front of the API
+TRUSTED_PROXIES = parse_networks(os.environ.get('TRUSTED_PROXIES', ''))
+
+def client_key(connection: HTTPConnection) -> ClientKey:
+    """Who a request is charged to: its address, with X-Client-Id as a sub-key"""
+    address = client_address(
+        connection.client.host if connection.client else None,
+        connection.headers.get('x-forwarded-for'),
+        TRUSTED_PROXIES
+    )
+    return ClientKey(address, connection.headers.get('x-client-id') or None)
+
+def admit_reflection(kind: str, key: ClientKey, request: MirrorRequest) -> None:
+    """Charge an LLM reflection to its client, raising OverLimit past its limits"""
+    if not ADMISSION_ENABLED or uses_rule_engine(request):
+        return
+    estimated = SYSTEM_PROMPT_TOKENS + estimate_tokens(mirror_prompt(request)) + EXPECTED_COMPLETION_TOKENS
+    try:
+        admission.admit(kind, key, estimated)
+    except OverLimit as e:
+        metrics.admission_denied.inc(kind, e.reason)
+        raise
+
+def limited_mirror_response(request: MirrorRequest) -> Reflection:
+    """Local reply served to a client over its limits"""
+    metrics.mirror_fallbacks.inc("limited")
+    if SHED_TO_RULES:
+        return rule_based_response(request)
+    return fallback_mirror_response()
+
+def over_limit(request: MirrorRequest, error: OverLimit) -> Reflection:
+    """429 with Retry-After, or the local reply when ADMISSION_OVER_LIMIT=fallback"""
+    if ADMISSION_OVER_LIMIT == 'fallback':
+        return limited_mirror_response(request)
+    raise HTTPException(status_code=429, detail=str(error), headers={"Retry-After": str(math.ceil(error.retry_after))})
+
+async def stream_mirror_reply(mirror_chat, prompt: str) -> AsyncIterator[str]:
+    """Yield Mirror text fragments as the model produces them.
+
+    Streams from the provider when ``mirror_stream`` is configured, otherwise
+    yields the chat client's whole completion at once. The call holds an LLM
+    guard slot for its whole duration.
+    """
+    async with llm_guard.admission():
+        if mirror_stream is None:
+            user_message = llm_chat_module().UserMessage(text=prompt)
+            yield await asyncio.wait_for(
+                metrics.time_llm_call(mirror_chat.send_message(user_message)), llm_guard.deadline_seconds
+            )
+            return
+        fragments = mirror_stream.stream(prompt).__aiter__()
+        while True:
+            # The deadline bounds each wait for the next fragment
+            try:
+                fragment = await asyncio.wait_for(fragments.__anext__(), llm_guard.deadline_seconds)
+            except StopAsyncIteration:
+                break
+            if fragment:
+                yield fragment
+
+def mirror_prompt(request: MirrorRequest) -> str:
+    """Bloom prompt carrying the session's bounded conversation memory"""
+    memory = conversation_memory.context(request.session_id, request.user_history)
+    return build_mirror_prompt(request.bloom_id, request.journal_text, memory)
+
+def sse_frame(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def reply_events(response: Reflection) -> AsyncIterator[Tuple[str, dict]]:
+    """Stream events for a reply that is already complete"""
+    yield "fragment", {"text": response.text}
+    yield "done", response.dict()
+
+async def stream_reflection(request: MirrorRequest) -> AsyncIterator[Tuple[str, dict]]:
+    """Yield ``fragment`` events as the Mirror reply is produced, then ``done``.
+
+    ``done`` carries the full ``MirrorResponse``; if the LLM fails before any
+    text was produced it carries the fallback reply instead.
+    """
+    if uses_rule_engine(request):
+        response = await record_journey(request, rule_based_response(request), choose_archetype=False)
+        yield "fragment", {"text": response.text}
+        yield "done", response.dict()
+        return
     
-    return 'listener'  # Default
+    fragments = []
+    try:
+        mirror_chat = get_mirror_chat(request.session_id) if mirror_stream is None else None
+        async with aclosing(stream_mirror_reply(mirror_chat, mirror_prompt(request))) as reply:
+            async for fragment in reply:
+                fragments.append(fragment)
+                yield "fragment", {"text": fragment}
+        response = await record_journey(request, build_mirror_response(request, "".join(fragments)))
+    except GuardRejected as e:
+        logging.warning(f"Mirror reflection stream shed: {str(e)}")
+        response = shed_mirror_response(request)
+        yield "fragment", {"text": response.text}
+    except Exception as e:
+        metrics.exceptions.inc("mirror_reflect_stream", type(e).__name__)
+        logging.error(f"Mirror reflection stream error: {str(e)}")
+        if fragments:
+            # Keep what the client already rendered rather than replacing it
+            response = build_mirror_response(request, "".join(fragments))
+        else:
+            metrics.mirror_fallbacks.inc("error")
+            response = fallback_mirror_response()
+    yield "done", response.dict()
 
-# Hall of Mirrors API endpoints
-@api_router.post("/mirror/reflect", response_model=MirrorResponse)
-async def mirror_reflect(request: MirrorRequest):
-    """Generate Mirror reflection for user's journal entry"""
+# Identical reflect requests in flight at the same time share one LLM call
+reflect_flight = SingleFlight()
+
+async def record_journey(request: MirrorRequest, response: Reflection, choose_archetype: bool = True) -> Reflection:
+    """Fold a reflection into the session memory and the session and daily rollups.
+
+    For B8 the archetype is taken from the signals accumulated over the whole
+    journey rather than from the final bloom alone.
+    """
+    conversation_memory.record(
+        request.session_id, request.bloom_id, request.journal_text, response.text, response.tone_tags
+    )
+    archetype_scores = classify(request.journal_text).archetype_scores
     try:
+        session_rollup = await record_session(
+            db, request.session_id, request.bloom_id, response.tone_tags, archetype_scores
+        )
+        if choose_archetype and request.bloom_id == 'B8':
+            archetype_id = journey_archetype(session_rollup)
+            if archetype_id:
+                response = Reflection(response.text, response.tone_tags, archetype_id)
+        await record_day(db, response.tone_tags, archetype_scores, response.archetype_id)
+    except Exception as e:
+        metrics.exceptions.inc("rollups", type(e).__name__)
+        logging.warning(f"Rollup update failed: {str(e)}")
+    return response
+
+async def generate_reflection(request: MirrorRequest, record_rollups: bool = True, read_cache: bool = True) -> Reflection:
+    """Produce a Mirror reflection, raising if the LLM call fails.
+
+    ``record_rollups=False`` leaves the rollups untouched and
+    ``read_cache=False`` always asks the LLM (the fresh reply still replaces
+    the cached one), e.g. when stored entries are being reprocessed.
+    """
+    async def finish(response: Reflection, choose_archetype: bool = True) -> Reflection:
+        if not record_rollups:
+            return response
+        return await record_journey(request, response, choose_archetype)
+    
+    if uses_rule_engine(request):
+        # The rule engine's B8 text names its own archetype; keep them matched
+        return await finish(rule_based_response(request), choose_archetype=False)
+    
+    # Replies written with a session's journey in the prompt are that
+    # session's alone, so only memoryless prompts go through the shared cache
+    memory = conversation_memory.context(request.session_id, request.user_history)
+    cacheable = not memory and reflection_cache.is_cacheable(request.bloom_id, request.journal_text)
+    # Held for the whole call, so a reply is cached under the prompts it was written with
+    templates = prompt_templates
+    if cacheable and read_cache:
+        cached = await reflection_cache.get(request.bloom_id, request.journal_text, templates.version)
+        if cached is not None:
+            return await finish(Reflection(**cached))
+    
+    async def call_llm() -> Reflection:
         # Get Mirror chat instance
         mirror_chat = get_mirror_chat(request.session_id)
         
-        # Create contextual prompt based on bloom
-        bloom_context = {
-            'B1': "The user is exploring what feels different about them today in their opening reflection.",
-            'B2': "The user is naming and sitting with a feeling that's present for them.",
-            'B3': "The user is examining a belief that might be creating heaviness.",
-            'B4': "The user is looking at a challenge as a potential doorway or catalyst.",
-            'B5': "The user is listening for inner guidance and wisdom.",
-            'B6': "The user is sensing what invitation or next step wants to emerge.",
-            'B7': "The user is integrating what has shifted during their spiral journey.",
-            'B8': "The user is ready to meet their archetype presence - who is walking with them."
-        }
-        
-        context = bloom_context.get(request.bloom_id, "The user is in reflection.")
+        # Send to LLM
+        prompt = templates.render(request.bloom_id, request.journal_text, memory)
+        user_message = llm_chat_module().UserMessage(text=prompt)
+        mirror_response = await llm_guard.call(lambda: metrics.time_llm_call(mirror_chat.send_message(user_message)))
         
-        prompt = f"""Context: {context}
+        response = build_mirror_response(request, mirror_response)
+        if cacheable:
+            await reflection_cache.set(request.bloom_id, request.journal_text, response.dict(), templates.version)
+        return await finish(response)
+    
+    # Double-clicks and client retries share a single upstream call
+    key = (request.session_id, request.bloom_id, request.journal_text)
+    return await reflect_flight.do(key, call_llm)
 
-User's reflection: "{request.journal_text}"
+def reflection_fallback(request: MirrorRequest, error: Exception) -> Reflection:
+    """Shed or fallback reply for a reflection that failed with error"""
+    if isinstance(error, GuardRejected):
+        logging.warning(f"Mirror reflection shed: {str(error)}")
+        return shed_mirror_response(request)
+    metrics.exceptions.inc("mirror_reflect", type(error).__name__)
+    logging.error(f"Mirror reflection error: {str(error)}")
+    metrics.mirror_fallbacks.inc("error")
+    return fallback_mirror_response()
 
-Please reflect back what you sense stirring in this person. Respond as the Mirror - warm, conversational, and slightly otherworldly. Help them feel seen and met exactly as they are."""
-        
-        # Send to LLM
-        user_message = UserMessage(text=prompt)
-        mirror_response = await mirror_chat.send_message(user_message)
-        
-        # Extract tone tags
-        tone_tags = extract_tone_tags(mirror_response)
-        
-        # Select archetype for B8 (final bloom)
-        archetype_id = None
-        if request.bloom_id == 'B8':
-            archetype_id = select_archetype(tone_tags, request.journal_text)
-        
-        return MirrorResponse(
-            text=mirror_response,
-            tone_tags=tone_tags,
-            archetype_id=archetype_id
-        )
-        
+def json_response(content: Any) -> Response:
+    """Serialize a plain JSON body with orjson, skipping FastAPI's response model pass"""
+    if isinstance(content, Response):
+        return content
+    return ORJSONResponse(content)
+
+async def run_idempotent(scope: str, key: Optional[str], payload: dict, handler: Callable[[], Awaitable[Any]]) -> Any:
+    """Run handler once per Idempotency-Key; repeats get the first response replayed.
+
+    If handler raises, the key is released and nothing is stored, so a retry
+    runs it again.
+    """
+    if key is None:
+        return await handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+
+    request_fingerprint = fingerprint(payload)
+    try:
+        replay = await idempotency.claim(scope, key, request_fingerprint)
+    except KeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except KeyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
-        logging.error(f"Mirror reflection error: {str(e)}")
-        # Fallback response if LLM fails
-        return MirrorResponse(
-            text="I'm listening... sometimes the deepest reflections emerge in silence.",
-            tone_tags=["gentle"],
-            archetype_id=None
-        )
+        # Losing deduplication beats failing the request
+        metrics.exceptions.inc("idempotency", type(e).__name__)
+        logging.error(f"Idempotency store unavailable: {str(e)}")
+        return await handler()
+    if replay is not None:
+        return ORJSONResponse(replay, headers={IDEMPOTENT_REPLAYED_HEADER: "true"})
+
+    try:
+        result = await handler()
+    except BaseException:
+        await idempotency.release(scope, key)
+        raise
+    try:
+        await idempotency.complete(scope, key, request_fingerprint, jsonable_encoder(result))
+    except Exception as e:
+        metrics.exceptions.inc("idempotency", type(e).__name__)
+        logging.error(f"Could not store idempotent response: {str(e)}")
+    return result
+
+# Upper bound on concurrent LLM calls made by one batch request
+MIRROR_BATCH_CONCURRENCY = int(os.environ.get('MIRROR_BATCH_CONCURRENCY', '8'))
+
+async def run_reflection_job(request_data: dict) -> dict:
+    # Raises when the LLM fails, so the queue retries the job
+    return (await generate_reflection(MirrorRequest(**request_data))).dict()
+
+def reflection_job_fallback(request_data: dict, error: Exception) -> dict:
+    """Reply stored with a job that failed its last attempt"""
+    return reflection_fallback(MirrorRequest(**request_data), error).dict()
+
+def defer_reflection_job(error: Exception) -> Optional[float]:
+    """Seconds to hold back a job the LLM guard refused; it has not used up an attempt"""
+    if isinstance(error, GuardRejected):
+        return llm_guard.breaker.stats()["open_for_seconds"]
+    return None
+
+# Reflections queued in Mongo and answered by background workers
+reflection_jobs = ReflectionJobQueue(
+    db.reflection_jobs,
+    run_reflection_job,
+    workers=int(os.environ.get('REFLECTION_JOB_WORKERS', '4')),
+    lease_seconds=float(os.environ.get('REFLECTION_JOB_LEASE_SECONDS', '120')),
+    poll_interval=float(os.environ.get('REFLECTION_JOB_POLL_INTERVAL', '0.5')),
+    max_attempts=int(os.environ.get('REFLECTION_JOB_MAX_ATTEMPTS', '3')),
+    fallback=reflection_job_fallback,
+    retry_backoff=float(os.environ.get('REFLECTION_JOB_RETRY_BACKOFF', '1')),
+    max_retry_backoff=float(os.environ.get('REFLECTION_JOB_MAX_RETRY_BACKOFF', '60')),
+    defer=defer_reflection_job
+)
+REFLECTION_JOB_TTL = int(os.environ.get('REFLECTION_JOB_TTL', '86400'))
+REFLECTION_JOB_MAX_WAIT = float(os.environ.get('REFLECTION_JOB_MAX_WAIT', '30'))
+
+def job_view(job: dict) -> dict:
+    """Public fields of a reflection job"""
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+        "response": job["response"],
+        "error": job["error"] if job["status"] == "failed" else None
+    }
+
+# Hall of Mirrors API endpoints
+@api_router.post("/mirror/reflect", response_model=MirrorResponse)
+async def mirror_reflect(
+    request: MirrorRequest, http_request: Request, idempotency_key: Optional[str] = Header(None)
+):
+    """Generate Mirror reflection for user's journal entry.
+
+    Retries sent with the same ``Idempotency-Key`` get the first reflection
+    back instead of paying for another LLM call.
+    """
+    async def reflect() -> dict:
+        admit_reflection("interactive", client_key(http_request), request)
+        return (await generate_reflection(request)).dict()
+
+    try:
+        return json_response(await run_idempotent("mirror_reflect", idempotency_key, request.dict(), reflect))
+    except HTTPException:
+        raise
+    except OverLimit as e:
+        return json_response(over_limit(request, e).dict())
+    except Exception as e:
+        # Fallback replies are not stored, so a retry gets another go at the LLM
+        return json_response(reflection_fallback(request, e).dict())
+
+@api_router.post("/mirror/jobs", status_code=202)
+async def create_mirror_job(request: MirrorJobRequest, http_request: Request):
+    """Queue a Mirror reflection and return its job id right away.
+
+    Poll ``GET /api/mirror/jobs/{id}`` for the result. Interactive jobs (the
+    bloom in progress) are picked up before batch jobs. A client over its
+    limits for the job's priority gets a 429.
+    """
+    try:
+        admit_reflection(request.priority, client_key(http_request), request)
+    except OverLimit as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    job = await reflection_jobs.enqueue(request.dict(exclude={'priority'}), request.priority)
+    return job_view(job)
+
+@api_router.get("/mirror/jobs/{job_id}")
+async def get_mirror_job(
+    job_id: str,
+    response: Response,
+    wait: float = Query(0, ge=0, description="Seconds to hold the request open until the job finishes")
+):
+    """Long-poll a reflection job.
+
+    Returns 200 with the ``MirrorResponse`` once the job is done, 200 with
+    ``status: "failed"``, the error and the fallback reply once its last
+    attempt failed, and 202 with the current status if it is still pending
+    after ``wait``.
+    """
+    job = await reflection_jobs.wait(job_id, min(wait, REFLECTION_JOB_MAX_WAIT))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] not in ("done", "failed"):
+        response.status_code = 202
+    return job_view(job)
+
+@api_router.post("/mirror/reflect/batch")
+async def mirror_reflect_batch(batch: MirrorBatchRequest, http_request: Request):
+    """Regenerate reflections for many entries, streamed back as NDJSON.
+
+    Items are fanned out to the LLM under a semaphore and each result line is
+    written as soon as it completes, so lines arrive in completion order and
+    carry the ``index`` of their request. A failed item yields the fallback
+    reply with ``status: "fallback"`` (or ``"shed"`` when the LLM guard
+    refused it) instead of failing the whole batch. Items past the client's
+    batch limits get ``status: "limited"``.
+    """
+    key = client_key(http_request)
+    limit = MIRROR_BATCH_CONCURRENCY
+    if batch.concurrency:
+        limit = max(1, min(batch.concurrency, MIRROR_BATCH_CONCURRENCY))
+    semaphore = asyncio.Semaphore(limit)
+
+    async def reflect_item(index: int, request: MirrorRequest) -> dict:
+        async with semaphore:
+            try:
+                admit_reflection("batch", key, request)
+            except OverLimit as e:
+                limited = limited_mirror_response(request).dict() if ADMISSION_OVER_LIMIT == 'fallback' else None
+                return {"index": index, "status": "limited", "response": limited, "error": str(e)}
+            try:
+                # Reprocessing must not count the same entries into the rollups
+                # again, nor return the replies it is meant to replace
+                response = await generate_reflection(request, record_rollups=False, read_cache=False)
+                return {"index": index, "status": "ok", "response": response.dict(), "error": None}
+            except GuardRejected as e:
+                return {"index": index, "status": "shed", "response": shed_mirror_response(request).dict(), "error": str(e)}
+            except Exception as e:
+                metrics.exceptions.inc("mirror_reflect_batch", type(e).__name__)
+                logging.error(f"Mirror batch reflection error (item {index}): {str(e)}")
+                metrics.mirror_fallbacks.inc("error")
+                return {"index": index, "status": "fallback", "response": fallback_mirror_response().dict(), "error": str(e)}
+
+    async def results():
+        tasks = [asyncio.create_task(reflect_item(i, r)) for i, r in enumerate(batch.requests)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            # Stop outstanding LLM calls if the client goes away mid-batch
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@api_router.post("/mirror/reflect/stream")
+async def mirror_reflect_stream(request: MirrorRequest, http_request: Request):
+    """Stream the Mirror reflection as Server-Sent Events.
+
+    Emits ``fragment`` frames with partial text as the model produces it and a
+    final ``done`` frame holding the full ``MirrorResponse``. If the LLM fails
+    before any text was sent, the ``done`` frame carries the fallback reply.
+    """
+    limited = None
+    try:
+        admit_reflection("interactive", client_key(http_request), request)
+    except OverLimit as e:
+        limited = over_limit(request, e)
+
+    async def events():
+        yield sse_frame("start", {"session_id": request.session_id, "bloom_id": request.bloom_id})
+        reply = reply_events(limited) if limited is not None else stream_reflection(request)
+        async with aclosing(reply) as reflection:
+            async for event, data in reflection:
+                yield sse_frame(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @api_router.post("/sessions", response_model=UserSession)
-async def create_session(session_data: SessionCreate):
-    """Create a new Hall session with progressive bloom unlocking"""
+async def create_session(session_data: SessionCreate, idempotency_key: Optional[str] = Header(None)):
+    """Create a new Hall session with progressive bloom unlocking.
+
+    Retries sent with the same ``Idempotency-Key`` get the session created by
+    the first request instead of a duplicate.
+    """
+    return json_response(await run_idempotent(
+        "sessions", idempotency_key, session_data.dict(), lambda: insert_session(session_data)
+    ))
+
+async def insert_session(session_data: SessionCreate) -> dict:
     # Determine blooms to unlock based on total sessions
     blooms_unlocked = 3  # First session: 3 blooms
     if session_data.total_sessions >= 2:
@@ -209,22 +762,363 @@ async def create_session(session_data: SessionCreate):
     # Save to database
     session_dict = session.dict()
     session_dict['started_at'] = session_dict['started_at'].isoformat()
-    await db.hall_sessions.insert_one(session_dict)
+    created = dict(session_dict)
+    if WRITE_BEHIND_ENABLED:
+        await session_writes.add(session_dict)
+    else:
+        await db.hall_sessions.insert_one(session_dict)
     
+    return created
+
+async def list_documents(
+    collection,
+    sort_field: str,
+    descending: bool,
+    allowed_fields: List[str],
+    limit: Optional[int],
+    cursor: Optional[str],
+    fields: Optional[str],
+    stream: bool
+):
+    """Serve a keyset-paginated page, or an NDJSON stream, of a collection"""
+    projection = projection_for(fields, allowed_fields, required=[sort_field, "id"])
+    try:
+        if stream:
+            lines = stream_ndjson(collection, sort_field, cursor, projection, descending, limit)
+            # Surface a bad cursor as a 400 before the streaming response starts
+            first = await lines.__anext__()
+        else:
+            documents, next_cursor = await fetch_page(
+                collection, sort_field, limit or DEFAULT_PAGE_SIZE, cursor, projection, descending
+            )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StopAsyncIteration:
+        return StreamingResponse(iter(()), media_type="application/x-ndjson")
+
+    if stream:
+        async def ndjson():
+            yield first
+            async for line in lines:
+                yield line
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    return ORJSONResponse(documents, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+@api_router.get("/sessions")
+async def list_sessions(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False
+):
+    """List Hall sessions, newest first.
+
+    Pages are cut with keyset pagination on ``started_at``/``id``; pass the
+    ``X-Next-Cursor`` response header back as ``cursor`` for the next page.
+    ``fields`` limits the returned fields and ``stream=true`` returns NDJSON.
+    """
+    return await list_documents(
+        db.hall_sessions, "started_at", True, list(UserSession.__fields__),
+        limit, cursor, fields, stream
+    )
+
+@api_router.get("/sessions/{session_id}/rollup")
+async def get_session_tone_rollup(session_id: str):
+    """Tone tag and archetype signal counts accumulated over a session"""
+    rollup = await get_session_rollup(db, session_id)
+    if not rollup:
+        raise HTTPException(status_code=404, detail="No reflections recorded for this session")
+    return rollup
+
+@api_router.get("/rollups/daily")
+async def list_daily_rollups(
+    start: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    limit: int = Query(31, ge=1, le=366)
+):
+    """Precomputed per-day tone tag and archetype counts, newest first"""
+    return await get_daily_rollups(db, start, end, limit)
+
+async def find_session(session_id: str) -> Optional[dict]:
+    # Sessions still waiting in the write-behind buffer are served from memory
+    session = session_writes.get(session_id) if WRITE_BEHIND_ENABLED else None
+    if session is None:
+        # Exclude MongoDB ObjectId at the database so the result is JSON serializable
+        session = await db.hall_sessions.find_one({"id": session_id}, {"_id": 0})
     return session
 
 @api_router.get("/sessions/{session_id}")
 async def get_session(session_id: str):
     """Get session details"""
-    session = await db.hall_sessions.find_one({"id": session_id})
+    session = await find_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Remove MongoDB ObjectId to make it JSON serializable
-    if '_id' in session:
-        del session['_id']
-    
-    return session
+    return ORJSONResponse(session)
+
+BLOOM_IDS = [f"B{number}" for number in range(1, 9)]
+
+# Journeys whose socket has been quiet this long are closed
+JOURNEY_IDLE_TIMEOUT = float(os.environ.get('JOURNEY_WS_IDLE_TIMEOUT', '900'))
+
+# Journey sockets currently open on this worker
+open_journeys = 0
+
+@api_router.websocket("/ws/journey/{session_id}")
+async def journey_socket(websocket: WebSocket, session_id: str):
+    """Run a whole spiral journey over one WebSocket.
+
+    The session and its unlock level are loaded once when the socket opens
+    and kept for the life of the journey. Messages are
+    JSON objects with a ``type``:
+
+    - client ``{"type": "bloom", "bloom_id", "journal_text", "provider"?}``;
+      the server answers ``start``, ``fragment`` frames with partial text and
+      ``done`` with the full ``MirrorResponse``, all tagged with the bloom_id
+    - client ``{"type": "complete"}`` ends the journey and frees its
+      resources; ``{"type": "ping"}`` is answered with ``pong``
+    - server ``{"type": "error", "detail"}`` for a message it cannot handle
+
+    An unknown session is closed with code 4404.
+    """
+    global open_journeys
+    await websocket.accept()
+
+    async def send(message: dict) -> None:
+        await websocket.send_text(json.dumps(message, default=json_default))
+
+    session = await find_session(session_id)
+    if not session:
+        await send({"type": "error", "detail": "Session not found"})
+        await websocket.close(code=4404)
+        return
+
+    open_journeys += 1
+    try:
+        await send({"type": "session", "session": session})
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive_json(), JOURNEY_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await websocket.close(code=1000, reason="Idle")
+                return
+            except (ValueError, KeyError, TypeError):
+                # Bad JSON, or a binary frame (which has no text)
+                await send({"type": "error", "detail": "Messages must be JSON"})
+                continue
+            kind = message.get("type") if isinstance(message, dict) else None
+
+            if kind == "ping":
+                await send({"type": "pong"})
+            elif kind == "complete":
+                conversation_memory.forget(session_id)
+                await send({"type": "complete"})
+                await websocket.close(code=1000)
+                return
+            elif kind == "bloom":
+                bloom_id = message.get("bloom_id")
+                journal_text = message.get("journal_text")
+                if bloom_id not in BLOOM_IDS or not isinstance(journal_text, str):
+                    await send({"type": "error", "detail": "A bloom needs a bloom_id (B1-B8) and journal_text"})
+                    continue
+                if BLOOM_IDS.index(bloom_id) >= session.get("blooms_unlocked", 3):
+                    await send({"type": "error", "bloom_id": bloom_id, "detail": "Bloom is locked for this session"})
+                    continue
+                # Fields were checked above; the session context is not revalidated per bloom
+                request = MirrorRequest.construct(
+                    session_id=session_id,
+                    bloom_id=bloom_id,
+                    journal_text=journal_text,
+                    user_history=[],
+                    provider=message.get("provider") if message.get("provider") in ("llm", "rules") else None
+                )
+                try:
+                    admit_reflection("interactive", client_key(websocket), request)
+                    reply = stream_reflection(request)
+                except OverLimit as e:
+                    if ADMISSION_OVER_LIMIT != 'fallback':
+                        await send({"type": "error", "bloom_id": bloom_id, "detail": str(e), "retry_after": math.ceil(e.retry_after)})
+                        continue
+                    reply = reply_events(limited_mirror_response(request))
+                await send({"type": "start", "bloom_id": bloom_id})
+                async with aclosing(reply) as reflection:
+                    async for event, data in reflection:
+                        if event == "done":
+                            await send({"type": "done", "bloom_id": bloom_id, "response": data})
+                        else:
+                            await send({"type": event, "bloom_id": bloom_id, **data})
+            else:
+                await send({"type": "error", "detail": f"Unknown message type: {kind}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        open_journeys -= 1
+
+@api_router.get("/writes")
+async def get_write_behind_stats():
+    """Report write-behind buffer activity"""
+    return {
+        "enabled": WRITE_BEHIND_ENABLED,
+        "hall_sessions": session_writes.stats(),
+        "status_checks": status_writes.stats()
+    }
+
+@api_router.get("/idempotency")
+async def get_idempotency_stats():
+    """Report Idempotency-Key claims, replays and conflicts"""
+    return idempotency.stats()
+
+@api_router.post("/mirror/prompts/reload")
+async def reload_prompts():
+    """Re-read MIRROR_PROMPTS_FILE and swap in the new bloom prompts.
+
+    Cached reflections are keyed by the prompts' version, so replies written
+    with the old prompts stop being served.
+    """
+    global prompt_templates
+    if not MIRROR_PROMPTS_FILE:
+        raise HTTPException(status_code=404, detail="MIRROR_PROMPTS_FILE is not set")
+    try:
+        prompt_templates = PromptTemplates.from_file(MIRROR_PROMPTS_FILE)
+    except InvalidPromptFile as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"source": prompt_templates.source, "version": prompt_templates.version, "blooms": prompt_templates.blooms()}
+
+@api_router.get("/mirror/admission")
+async def get_admission_stats():
+    """Report per-client admission decisions and the configured limits"""
+    return {"enabled": ADMISSION_ENABLED, "over_limit": ADMISSION_OVER_LIMIT, **admission.stats()}
+
+@api_router.get("/mirror/memory")
+async def get_conversation_memory_stats():
+    """Report conversation memory size and compactions"""
+    return conversation_memory.stats()
+
+@api_router.get("/mirror/cache")
+async def get_reflection_cache_stats():
+    """Report reflection cache hit ratio"""
+    return reflection_cache.stats()
+
+@api_router.get("/mirror/guard")
+async def get_llm_guard_state():
+    """Report LLM circuit breaker state and admission counters"""
+    return llm_guard.stats()
+
+@api_router.get("/mirror/workers")
+async def get_reflection_worker_stats():
+    """Report reflection job worker activity"""
+    return reflection_jobs.stats()
+
+@api_router.get("/mirror/coalescing")
+async def get_reflect_coalescing_stats():
+    """Report how many LLM calls request coalescing has saved"""
+    return reflect_flight.stats()
+
+@api_router.post("/sync")
+async def sync_client_data(request: Request):
+    """Ingest new Dexie sessions, reflections and journal entries.
+
+    Clients send only records at or after the high-water marks returned by the
+    previous sync; records are upserted by client and local key, so resending
+    is harmless. The body may be gzip or deflate compressed.
+    """
+    try:
+        body = decode_body(await request.body(), request.headers.get('content-encoding'))
+        payload = SyncRequest.model_validate(json.loads(body))
+    except PayloadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    tables = {
+        'sessions': payload.sessions,
+        'reflections': payload.reflections,
+        'journalEntries': payload.journal_entries
+    }
+    if sum(len(records) for records in tables.values()) > MAX_RECORDS_PER_SYNC:
+        raise HTTPException(status_code=413, detail=f"Send at most {MAX_RECORDS_PER_SYNC} records per sync")
+
+    return await apply_sync(db, payload.client_id, tables)
+
+@api_router.get("/sync/{client_id}")
+async def get_sync_state(client_id: str):
+    """High-water marks a client should sync from"""
+    return {"high_water_marks": await get_high_water_marks(db, client_id)}
+
+async def archive_query(client_id: str, table: str, q: Optional[str], tone: Optional[str], archetype: Optional[str]):
+    """Collection and filter for an archive request, or a 404/400"""
+    if table not in SYNC_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown archive table: {table}")
+    try:
+        query = await archive.archive_filter(db, client_id, table, q, tone, archetype)
+    except archive.InvalidArchiveQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return db[SYNC_TABLES[table].collection], query
+
+@api_router.get("/archive/{client_id}/{table}")
+async def list_archive(
+    client_id: str,
+    table: str,
+    response: Response,
+    q: Optional[str] = Query(None, min_length=1, max_length=200),
+    tone: Optional[str] = None,
+    archetype: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Browse a client's synced sessions, reflections or journalEntries, newest first.
+
+    ``q`` searches reflection text and journal content through a text index;
+    ``tone`` and ``archetype`` filter by tone tag and archetype. Pass the
+    ``X-Next-Cursor`` response header back as ``cursor`` for the next page.
+    """
+    collection, query = await archive_query(client_id, table, q, tone, archetype)
+    try:
+        documents, next_cursor = await fetch_page(
+            collection, archive.SORT_FIELD, limit, cursor, None, True, query, archive.ID_FIELD
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return documents
+
+@api_router.get("/archive/{client_id}/{table}/export")
+async def export_archive(
+    client_id: str,
+    table: str,
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+    q: Optional[str] = Query(None, min_length=1, max_length=200),
+    tone: Optional[str] = None,
+    archetype: Optional[str] = None
+):
+    """Download every matching archive record as NDJSON or CSV.
+
+    Records are streamed from the database cursor in chunks, so the export
+    is never built in memory.
+    """
+    collection, query = await archive_query(client_id, table, q, tone, archetype)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        archive.export_chunks(collection, table, query, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'}
+    )
+
+@api_router.get("/ready")
+async def get_readiness(response: Response):
+    """503 until Mongo is reachable and the LLM client is loaded, then 200"""
+    if not readiness.ready:
+        response.status_code = 503
+    return readiness.stats()
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of request, LLM and Mongo metrics"""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
 # Original endpoints
 @api_router.get("/")
@@ -235,24 +1129,39 @@ async def root():
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
-
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
-
-# Include the router in the main app
-app.include_router(api_router)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
+    if WRITE_BEHIND_ENABLED:
+        await status_writes.add(status_obj.dict())
+    else:
+        _ = await db.status_checks.insert_one(status_obj.dict())
+    return ORJSONResponse(status_obj.dict())
+
+@api_router.get("/status")
+async def get_status_checks(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False
+):
+    """List status checks, oldest first, paginated like /api/sessions"""
+    return await list_documents(
+        db.status_checks, "timestamp", False, list(StatusCheck.__fields__),
+        limit, cursor, fields, stream
+    )
+
+metrics.registry.gauge("hall_llm_in_flight", "LLM calls currently running", lambda: llm_guard.in_flight)
+metrics.registry.gauge("hall_llm_queued", "LLM calls waiting for a slot", lambda: llm_guard.queued)
+metrics.registry.gauge(
+    "hall_llm_breaker_open", "1 while the LLM circuit breaker rejects calls",
+    lambda: llm_guard.breaker.state != "closed"
 )
+metrics.registry.gauge(
+    "hall_conversation_memory_sessions", "Sessions held in conversation memory", lambda: len(conversation_memory)
+)
+metrics.registry.gauge(
+    "hall_reflection_job_workers_busy", "Reflection job workers processing a job", lambda: reflection_jobs.busy
+)
+metrics.registry.gauge("hall_journey_sockets_open", "Open spiral journey WebSockets", lambda: open_journeys)
+metrics.registry.gauge("hall_ready", "1 once every startup warm-up has passed", lambda: readiness.ready)
 
 # Configure logging
 logging.basicConfig(
@@ -261,6 +1170,108 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+def mongo_indexes() -> List[IndexSpec]:
+    """Indexes the enabled features rely on"""
+    specs = list(REQUIRED_INDEXES)
+    if reflection_cache.enabled:
+        specs.append(IndexSpec(
+            "reflection_cache", [("created_at", 1)], "created_at_ttl",
+            expire_after_seconds=int(reflection_cache.ttl)
+        ))
+    specs.append(IndexSpec(
+        "idempotency_keys", [("created_at", 1)], "created_at_ttl", expire_after_seconds=int(idempotency.ttl)
+    ))
+    # Finished jobs are kept long enough for clients to collect them
+    specs.append(IndexSpec(
+        "reflection_jobs", [("finished_at", 1)], "finished_at_ttl", expire_after_seconds=REFLECTION_JOB_TTL
+    ))
+    return specs
+
+async def warm_mongo():
+    """Open the Mongo connection and make sure the indexes exist"""
+    await db.command('ping')
+    await ensure_indexes(db, mongo_indexes())
+
+async def warm_llm():
+    # In a thread, so requests are served while the SDK loads
+    await asyncio.to_thread(llm_chat_module)
+
+readiness = Readiness(
+    {"mongo": warm_mongo, "llm": warm_llm},
+    retry_interval=float(os.environ.get('WARM_UP_RETRY_INTERVAL', '5'))
+)
+
+def use_database(database) -> None:
+    """Point the routes and every component holding a collection at database"""
+    global db
+    db = database
+    reflection_cache.collection = database.reflection_cache
+    session_writes.collection = database.hall_sessions
+    status_writes.collection = database.status_checks
+    reflection_jobs.collection = database.reflection_jobs
+    idempotency.collection = database.idempotency_keys
+
+# Apps built by create_app() share the Mongo client and the background
+# workers: the first app to start starts them and the last one to stop
+# closes them, reconnecting if another app starts after that
+running_apps = 0
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client, running_apps
+    if running_apps == 0:
+        if client is None:
+            client = connect_mongo()
+            use_database(client[DB_NAME])
+        # Warm-ups run concurrently in the background; /api/ready reports when they are done
+        readiness.start()
+        if WRITE_BEHIND_ENABLED:
+            session_writes.start()
+            status_writes.start()
+        reflection_jobs.start()
+    running_apps += 1
+    try:
+        yield
+    finally:
+        running_apps -= 1
+        if running_apps == 0:
+            await readiness.close()
+            # Hand unfinished jobs back to the queue and flush buffered writes
+            # before the connection goes away
+            await reflection_jobs.close()
+            if WRITE_BEHIND_ENABLED:
+                await asyncio.gather(session_writes.close(), status_writes.close())
+            if mirror_stream is not None:
+                await mirror_stream.close()
+            client.close()
+            client = None
+
+def create_app() -> FastAPI:
+    """Build the API app.
+
+    Nothing slow happens here: Mongo connects and the LLM SDK is imported by
+    the lifespan warm-ups (or on first use), so a new worker starts serving
+    straight away.
+    """
+    app = FastAPI(lifespan=lifespan)
+
+    # Include the router in the main app
+    app.include_router(api_router)
+
+    # Compress larger listings and sync results; streamed responses pass through
+    app.add_middleware(GZipCompleteMiddleware, minimum_size=1024)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAYED_HEADER],
+    )
+
+    # Outermost, so route latency includes every other middleware
+    app.add_middleware(metrics.MetricsMiddleware)
+    return app
+
+app = create_app()
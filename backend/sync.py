@@ -0,0 +1,130 @@
+"""Delta sync of the client's Dexie journal tables into MongoDB."""
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_RECORDS_PER_SYNC = 5000
+
+
+class SyncTable(NamedTuple):
+    collection: str
+    key_field: str        # unique per client, e.g. the Dexie uuid or ++id
+    timestamp_field: str  # drives the high-water mark
+
+
+# Dexie table name -> server collection
+SYNC_TABLES = {
+    'sessions': SyncTable('sync_sessions', 'uuid', 'startedAt'),
+    'reflections': SyncTable('sync_reflections', 'id', 'createdAt'),
+    'journalEntries': SyncTable('sync_journal_entries', 'id', 'createdAt'),
+}
+
+SYNC_STATE_COLLECTION = 'sync_state'
+
+
+class PayloadTooLarge(ValueError):
+    pass
+
+
+def decode_body(body: bytes, content_encoding: Optional[str], max_bytes: int = MAX_BODY_BYTES) -> bytes:
+    """Undo gzip/deflate request compression without inflating past max_bytes"""
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        data = body
+    elif encoding in ("gzip", "deflate"):
+        wbits = 16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS
+        decompressor = zlib.decompressobj(wbits)
+        try:
+            data = decompressor.decompress(body, max_bytes + 1)
+        except zlib.error as e:
+            raise ValueError(f"Invalid {encoding} body") from e
+    else:
+        raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
+    if len(data) > max_bytes:
+        raise PayloadTooLarge(f"Sync payload exceeds {max_bytes} bytes")
+    return data
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Dexie stores Dates; they arrive as ISO strings or epoch milliseconds"""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    return None
+
+
+def _clean(record: Dict[str, Any]) -> Dict[str, Any]:
+    # Field names that Mongo would read as operators or paths are dropped
+    return {k: v for k, v in record.items() if k != '_id' and not k.startswith('$') and '.' not in k}
+
+
+def build_upserts(client_id: str, table: SyncTable, records: List[Dict[str, Any]], synced_at: datetime):
+    """Upsert operations for one table plus its newest timestamp and reject count"""
+    operations = []
+    newest = None
+    rejected = 0
+    for record in records:
+        key = record.get(table.key_field)
+        if key is None:
+            rejected += 1
+            continue
+        document = _clean(record)
+        created_at = parse_timestamp(record.get(table.timestamp_field))
+        document.update(client_id=client_id, local_key=key, created_at=created_at, synced_at=synced_at)
+        operations.append(UpdateOne({'client_id': client_id, 'local_key': key}, {'$set': document}, upsert=True))
+        if created_at is not None and (newest is None or created_at > newest):
+            newest = created_at
+    return operations, newest, rejected
+
+
+async def apply_sync(db, client_id: str, tables: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Upsert a batch of deltas and advance the client's high-water marks"""
+    synced_at = datetime.utcnow()
+    accepted: Dict[str, int] = {}
+    rejected: Dict[str, int] = {}
+    marks: Dict[str, datetime] = {}
+    for name, records in tables.items():
+        table = SYNC_TABLES[name]
+        operations, newest, rejected[name] = build_upserts(client_id, table, records, synced_at)
+        accepted[name] = len(operations)
+        if operations:
+            try:
+                await db[table.collection].bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Keep the mark where it was so the client resends this table
+                failed = len(e.details.get('writeErrors', []))
+                accepted[name] -= failed
+                rejected[name] += failed
+                continue
+        if newest is not None:
+            marks[f'high_water_marks.{name}'] = newest
+
+    if marks:
+        await db[SYNC_STATE_COLLECTION].update_one(
+            {'client_id': client_id},
+            {'$max': marks, '$set': {'synced_at': synced_at}},
+            upsert=True
+        )
+    return {
+        'accepted': accepted,
+        'rejected': rejected,
+        'high_water_marks': await get_high_water_marks(db, client_id),
+    }
+
+
+async def get_high_water_marks(db, client_id: str) -> Dict[str, Optional[str]]:
+    """Newest timestamp stored per table; clients resend from there (inclusive)"""
+    state = await db[SYNC_STATE_COLLECTION].find_one({'client_id': client_id}, {'_id': 0, 'high_water_marks': 1})
+    stored = (state or {}).get('high_water_marks', {})
+    return {name: stored[name].isoformat() if name in stored else None for name in SYNC_TABLES}
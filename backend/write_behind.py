@@ -0,0 +1,143 @@
+"""Write-behind buffering of inserts into batched insert_many calls."""
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindBuffer:
+    """Queue documents in memory and insert them in batches.
+
+    A flush happens once ``max_batch`` documents are pending or
+    ``flush_interval`` seconds have passed, whichever is first. Documents stay
+    readable through ``get`` until their batch has been written, which gives
+    read-your-writes for lookups by ``key_field``. Once ``max_pending``
+    documents are waiting, ``add`` flushes first and, if that fails too
+    (e.g. Mongo is down), inserts its document directly so the error reaches
+    the caller instead of the buffer growing without bound. After a failed
+    flush the background flusher backs off from ``retry_backoff`` up to
+    ``max_retry_backoff`` seconds.
+    """
+
+    def __init__(
+        self,
+        collection,
+        key_field: str = "id",
+        max_batch: int = 100,
+        flush_interval: float = 0.05,
+        max_pending: int = 10000,
+        retry_backoff: float = 0.5,
+        max_retry_backoff: float = 30.0,
+    ):
+        self.collection = collection
+        self.key_field = key_field
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self._pending: Dict[Any, dict] = {}
+        self._flushing: Dict[Any, dict] = {}
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.written = 0
+        self.failed_batches = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background flusher and write everything still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._pending:
+            logging.error(f"Write-behind buffer for {self.collection.name} dropped {len(self._pending)} documents on close")
+
+    async def add(self, document: dict) -> None:
+        if len(self._pending) >= self.max_pending:
+            await self.flush()
+            if len(self._pending) >= self.max_pending:
+                # Writes are failing; this one fails (or succeeds) on its own
+                await self.collection.insert_one(dict(document))
+                self.written += 1
+                return
+        self._pending[document[self.key_field]] = document
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    def get(self, key: Any) -> Optional[dict]:
+        """Return a copy of a document that has not been written yet"""
+        document = self._pending.get(key) or self._flushing.get(key)
+        return dict(document) if document is not None else None
+
+    async def _run(self) -> None:
+        backoff = 0.0
+        while True:
+            if backoff:
+                # A full buffer does not cut the wait short while writes are failing
+                await asyncio.sleep(backoff)
+            else:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+            if await self.flush():
+                backoff = 0.0
+            else:
+                backoff = min(backoff * 2 or self.retry_backoff, self.max_retry_backoff)
+
+    async def flush(self) -> bool:
+        """Write pending documents in batches; False if a batch failed"""
+        async with self._lock:
+            while self._pending:
+                keys = list(self._pending)[:self.max_batch]
+                batch = {key: self._pending.pop(key) for key in keys}
+                self._flushing = batch
+                try:
+                    # insert_many adds _id to the dicts; insert copies so pending reads stay clean
+                    await self.collection.insert_many([dict(d) for d in batch.values()], ordered=False)
+                    self.written += len(batch)
+                except BulkWriteError as e:
+                    failed = {error["index"] for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY}
+                    self._requeue(batch, [key for i, key in enumerate(batch) if i in failed])
+                    self.written += len(batch) - len(failed)
+                    self.failed_batches += 1
+                    logging.error(f"Write-behind batch for {self.collection.name} partially failed: {str(e)}")
+                    if failed:
+                        return False
+                except Exception as e:
+                    self._requeue(batch, list(batch))
+                    self.failed_batches += 1
+                    logging.error(f"Write-behind batch for {self.collection.name} failed: {str(e)}")
+                    return False
+                finally:
+                    self._flushing = {}
+                self.batches += 1
+        return True
+
+    def _requeue(self, batch: Dict[Any, dict], keys) -> None:
+        # Failed documents go back in front of anything added meanwhile
+        retry = {key: batch[key] for key in keys}
+        retry.update(self._pending)
+        self._pending = retry
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "written": self.written,
+            "failed_batches": self.failed_batches,
+        }
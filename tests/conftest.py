@@ -0,0 +1,29 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+# The backend is a flat set of modules run from its own directory
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "benchmarks"))
+
+# server.py reads these at import; tests swap in an in-memory database
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "hall_tests")
+
+
+@pytest.fixture
+def server():
+    """The server module pointed at a fresh in-memory database"""
+    import server as server_module
+    import load_test
+    load_test.install_stub_llm_module()
+    mongo = AsyncMongoMockClient()
+    # Apps started after every earlier one stopped reconnect to the same data
+    server_module.connect_mongo = lambda: mongo
+    server_module.client = mongo
+    server_module.use_database(mongo["hall_tests"])
+    return server_module
@@ -0,0 +1,141 @@
+import pytest
+from starlette.requests import Request
+
+from admission import AdmissionController, ClientKey, Limits, OverLimit, client_address, parse_networks
+
+PROXIES = parse_networks("10.0.0.0/8, 192.168.1.5")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def controller(clock, rate=1.0, burst=2, token_budget=1000, window_seconds=60.0, **kwargs):
+    limits = Limits(rate=rate, burst=burst, token_budget=token_budget, window_seconds=window_seconds)
+    return AdmissionController({"interactive": limits, "batch": limits}, clock=clock, **kwargs)
+
+
+def test_bucket_refills_at_rate_up_to_burst():
+    clock = FakeClock()
+    admission = controller(clock, rate=0.5, burst=2)
+    key = ClientKey("203.0.113.7")
+    admission.admit("interactive", key, 10)
+    admission.admit("interactive", key, 10)
+    with pytest.raises(OverLimit) as refused:
+        admission.admit("interactive", key, 10)
+    assert refused.value.reason == "rate"
+    assert refused.value.retry_after == pytest.approx(2.0)
+
+    clock.now += 1.0
+    with pytest.raises(OverLimit) as refused:
+        admission.admit("interactive", key, 10)
+    assert refused.value.retry_after == pytest.approx(1.0)
+
+    clock.now += 1.0
+    admission.admit("interactive", key, 10)
+
+    # A long idle spell refills only up to the burst
+    clock.now += 600
+    admission.admit("interactive", key, 10)
+    admission.admit("interactive", key, 10)
+    with pytest.raises(OverLimit):
+        admission.admit("interactive", key, 10)
+
+
+def test_budget_retry_after_is_when_enough_usage_leaves_the_window():
+    clock = FakeClock()
+    admission = controller(clock, rate=100, burst=100, token_budget=100, window_seconds=60)
+    key = ClientKey("203.0.113.7")
+    admission.admit("interactive", key, 40)
+    clock.now += 10
+    admission.admit("interactive", key, 40)
+    clock.now += 10
+
+    with pytest.raises(OverLimit) as refused:
+        admission.admit("interactive", key, 30)
+    assert refused.value.reason == "token budget"
+    # Only the first charge has to expire, 60 s after it was made
+    assert refused.value.retry_after == 40
+
+    clock.now += 40
+    admission.admit("interactive", key, 30)
+
+
+def test_refusals_are_not_charged():
+    clock = FakeClock()
+    admission = controller(clock, rate=1, burst=1, token_budget=100)
+    key = ClientKey("203.0.113.7")
+    with pytest.raises(OverLimit):
+        admission.admit("interactive", key, 500)
+    admission.admit("interactive", key, 50)
+    assert admission.admitted == 1 and admission.denied == 1
+
+
+def test_kinds_have_separate_buckets():
+    clock = FakeClock()
+    admission = controller(clock, burst=1)
+    key = ClientKey("203.0.113.7")
+    admission.admit("interactive", key, 10)
+    admission.admit("batch", key, 10)
+    with pytest.raises(OverLimit):
+        admission.admit("interactive", key, 10)
+
+
+def test_client_ids_share_their_address_limits():
+    clock = FakeClock()
+    admission = controller(clock, rate=0.01, burst=2, clients_per_address=3)
+    # Separate ids behind one address each get the per-client limits
+    admission.admit("interactive", ClientKey("203.0.113.7", "alice"), 10)
+    admission.admit("interactive", ClientKey("203.0.113.7", "alice"), 10)
+    with pytest.raises(OverLimit):
+        admission.admit("interactive", ClientKey("203.0.113.7", "alice"), 10)
+    admission.admit("interactive", ClientKey("203.0.113.7", "bob"), 10)
+
+    # but inventing ids stops at clients_per_address times those limits
+    for n in range(3):
+        admission.admit("interactive", ClientKey("203.0.113.7", f"rotated-{n}"), 10)
+    with pytest.raises(OverLimit):
+        admission.admit("interactive", ClientKey("203.0.113.7", "rotated-again"), 10)
+    admission.admit("interactive", ClientKey("198.51.100.2", "rotated-again"), 10)
+
+
+def test_state_is_bounded_per_kind():
+    clock = FakeClock()
+    admission = controller(clock, max_clients=2)
+    for n in range(5):
+        admission.admit("interactive", ClientKey(f"203.0.113.{n}"), 10)
+    stats = admission.stats()
+    assert stats["clients"]["interactive"] == 2
+    assert stats["addresses"]["interactive"] == 2
+
+
+def test_untrusted_peer_is_its_own_address():
+    assert client_address("203.0.113.7", "1.2.3.4", PROXIES) == "203.0.113.7"
+    assert client_address(None, None, PROXIES) == "unknown"
+
+
+def test_forwarded_for_is_read_from_the_right_past_trusted_proxies():
+    # The client wrote the left-most hop itself; the proxies appended the rest
+    assert client_address("10.0.0.1", "1.2.3.4, 203.0.113.7, 192.168.1.5", PROXIES) == "203.0.113.7"
+    assert client_address("10.0.0.1", "not-an-ip, 10.0.0.2", PROXIES) == "not-an-ip"
+    assert client_address("10.0.0.1", "10.0.0.3, 10.0.0.2", PROXIES) == "10.0.0.3"
+    assert client_address("10.0.0.1", None, PROXIES) == "10.0.0.1"
+
+
+def test_server_keys_on_address_with_client_id_as_sub_key(server, monkeypatch):
+    monkeypatch.setattr(server, "TRUSTED_PROXIES", PROXIES)
+
+    def request(peer, headers):
+        return Request({
+            "type": "http", "method": "POST", "path": "/", "client": (peer, 4242),
+            "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+        })
+
+    assert server.client_key(request("10.0.0.1", {
+        "x-forwarded-for": "1.2.3.4, 203.0.113.7", "x-client-id": "alice"
+    })) == ClientKey("203.0.113.7", "alice")
+    assert server.client_key(request("198.51.100.2", {"x-forwarded-for": "1.2.3.4"})) == ClientKey("198.51.100.2")
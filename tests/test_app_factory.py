@@ -0,0 +1,25 @@
+from starlette.testclient import TestClient
+
+
+def create_session(client):
+    response = client.post("/api/sessions", json={"total_sessions": 1})
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_apps_share_the_connection_until_the_last_one_stops(server):
+    with TestClient(server.create_app()) as first:
+        with TestClient(server.create_app()) as second:
+            session_id = create_session(second)
+        # The second app stopping leaves the first one connected
+        assert server.running_apps == 1
+        assert first.get(f"/api/sessions/{session_id}").status_code == 200
+        assert server.reflection_jobs.stats()["workers"] > 0
+    assert server.running_apps == 0
+    assert server.client is None
+    assert server.reflection_jobs.stats()["workers"] == 0
+
+    # An app started after every other one stopped reconnects
+    with TestClient(server.create_app()) as third:
+        assert third.get(f"/api/sessions/{session_id}").status_code == 200
+        create_session(third)
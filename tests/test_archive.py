@@ -0,0 +1,122 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from starlette.testclient import TestClient
+
+import archive
+from archive import InvalidArchiveQuery, archive_filter, export_chunks, session_keys
+from sync import apply_sync
+
+SESSIONS = [
+    {"uuid": "u1", "id": 1, "startedAt": "2024-05-01T09:00:00", "toneTags": ["calm", "hopeful"], "archetypeId": "sage"},
+    {"uuid": "u2", "id": 2, "startedAt": "2024-05-02T09:00:00", "toneTags": ["heavy"], "archetypeId": "seeker"},
+    {"uuid": "u3", "id": 3, "startedAt": "2024-05-03T09:00:00", "toneTags": ["calm"], "archetypeId": "seeker"},
+]
+REFLECTIONS = [
+    {"id": 10, "sessionId": 1, "petal": "B1", "text": "one", "tone": "calm", "createdAt": "2024-05-01T10:00:00"},
+    {"id": 11, "sessionId": 2, "petal": "B1", "text": "two", "tone": "heavy", "createdAt": "2024-05-02T10:00:00"},
+    {"id": 12, "sessionId": 3, "petal": "B1", "text": "three", "tone": "calm", "createdAt": "2024-05-03T10:00:00"},
+    # Same timestamp: the Dexie key breaks the tie
+    {"id": 13, "sessionId": 3, "petal": "B2", "text": "four", "tone": "calm", "createdAt": "2024-05-03T10:00:00"},
+    {"id": 14, "sessionId": 3, "petal": "B3", "text": "five", "tone": "heavy", "createdAt": "2024-05-04T10:00:00"},
+]
+
+
+def synced_db():
+    db = AsyncMongoMockClient()["hall_tests"]
+    asyncio.run(apply_sync(db, "c", {"sessions": SESSIONS, "reflections": REFLECTIONS}))
+    asyncio.run(apply_sync(db, "other", {"sessions": SESSIONS[:1], "reflections": REFLECTIONS[:1]}))
+    return db
+
+
+def matching(db, table, **filters):
+    async def run():
+        query = await archive_filter(db, "c", table, filters.get("q"), filters.get("tone"), filters.get("archetype"))
+        collection = db[{"sessions": "sync_sessions", "reflections": "sync_reflections"}[table]]
+        return sorted([document["local_key"] async for document in collection.find(query)])
+    return asyncio.run(run())
+
+
+def test_session_keys_are_the_dexie_ids_of_matching_sessions():
+    db = synced_db()
+    assert sorted(asyncio.run(session_keys(db, "c", "calm", None))) == [1, 3]
+    assert asyncio.run(session_keys(db, "c", "calm", "seeker")) == [3]
+    assert asyncio.run(session_keys(db, "c", "joyful", None)) == []
+
+
+def test_sessions_filter_on_their_own_tags():
+    db = synced_db()
+    assert matching(db, "sessions", tone="calm") == ["u1", "u3"]
+    assert matching(db, "sessions", archetype="seeker") == ["u2", "u3"]
+
+
+def test_reflections_filter_on_their_tone_and_the_owning_sessions_archetype():
+    db = synced_db()
+    assert matching(db, "reflections", tone="heavy") == [11, 14]
+    assert matching(db, "reflections", archetype="seeker") == [11, 12, 13, 14]
+    assert matching(db, "reflections", tone="calm", archetype="seeker") == [12, 13]
+    assert matching(db, "reflections") == [10, 11, 12, 13, 14]
+
+
+def test_journal_entries_filter_by_tone_through_the_owning_session():
+    query = asyncio.run(archive_filter(synced_db(), "c", "journalEntries", "rest", "calm", None))
+    assert query == {"client_id": "c", "$text": {"$search": "rest"}, "sessionId": {"$in": [1, 3]}}
+
+
+def test_text_search_is_refused_for_sessions():
+    with pytest.raises(InvalidArchiveQuery):
+        asyncio.run(archive_filter(synced_db(), "c", "sessions", "calm", None, None))
+
+
+def test_archive_pages_newest_first_by_created_at_then_local_key(server):
+    server.use_database(synced_db())
+    client = TestClient(server.create_app())
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/archive/c/reflections", params=params)
+        assert response.status_code == 200
+        pages.append([document["local_key"] for document in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert pages == [[14, 13], [12, 11], [10]]
+    assert client.get("/api/archive/c/reflections", params={"cursor": "bad"}).status_code == 400
+    assert client.get("/api/archive/c/unknown").status_code == 404
+
+
+def export(db, table, fmt, chunk_rows, monkeypatch):
+    monkeypatch.setattr(archive, "EXPORT_CHUNK_ROWS", chunk_rows)
+
+    async def run():
+        collection = db[{"sessions": "sync_sessions", "reflections": "sync_reflections"}[table]]
+        return [chunk async for chunk in export_chunks(collection, table, {"client_id": "c"}, fmt)]
+    return asyncio.run(run())
+
+
+def test_csv_export_joins_lists_and_chunks_rows(monkeypatch):
+    chunks = export(synced_db(), "sessions", "csv", 2, monkeypatch)
+    assert len(chunks) == 2
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == archive.EXPORT_COLUMNS["sessions"]
+    assert rows[1] == ["u3", "2024-05-03T09:00:00", "", "calm", "seeker", ""]
+    assert rows[3][3] == "calm;hopeful"
+    # The header travels with the first chunk, then every chunk holds chunk_rows rows
+    assert [len(list(csv.reader(io.StringIO(chunk)))) for chunk in chunks] == [3, 1]
+
+
+def test_ndjson_export_chunks_on_row_boundaries(monkeypatch):
+    chunks = export(synced_db(), "reflections", "ndjson", 2, monkeypatch)
+    assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
+    assert all(chunk.endswith("\n") for chunk in chunks)
+    keys = [json.loads(line)["local_key"] for line in "".join(chunks).splitlines()]
+    assert keys == [14, 13, 12, 11, 10]
+
+
+def test_export_of_nothing_yields_no_chunks(monkeypatch):
+    db = AsyncMongoMockClient()["hall_tests"]
+    assert export(db, "reflections", "ndjson", 2, monkeypatch) == []
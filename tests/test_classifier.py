@@ -0,0 +1,50 @@
+import pytest
+
+from classifier import classify, top_archetype, top_tone_tags
+
+
+@pytest.mark.parametrize("word, tone", [
+    ("creating", "creative"),
+    ("loving", "love"),
+    ("caring", "love"),
+    ("emerging", "creative"),
+    ("understood", "clarity"),
+    ("gently", "gentle"),
+    ("realised", "clarity"),
+])
+def test_inflected_forms_score_their_tone(word, tone):
+    assert classify(word).tone_scores == {tone: 1}
+
+
+@pytest.mark.parametrize("word, archetype", [
+    ("exploring", "seeker"),
+    ("caring", "guardian"),
+    ("creating", "creator"),
+    ("heard", "listener"),
+    ("knew", "sage"),
+])
+def test_inflected_forms_score_their_archetype(word, archetype):
+    assert classify(word).archetype_scores == {archetype: 1}
+
+
+@pytest.mark.parametrize("word", ["seed", "news", "seems", "hearth", "spacey", "pathos", "madness"])
+def test_lookalike_words_score_nothing(word):
+    result = classify(word)
+    assert result.tone_scores == {}
+    assert result.archetype_scores == {}
+
+
+def test_words_are_matched_case_insensitively_and_counted():
+    result = classify("Calm, CALM and calmly; I trust the path.")
+    assert result.tone_scores == {"peace": 3, "trust": 1}
+    assert result.archetype_scores == {"seeker": 1}
+
+
+def test_top_tone_tags_breaks_ties_by_declaration_order():
+    assert top_tone_tags({"gentle": 1, "peace": 1, "love": 2, "heavy": 1}) == ["love", "peace", "heavy"]
+
+
+def test_top_archetype():
+    assert top_archetype({}) is None
+    assert top_archetype({"sage": 1, "listener": 1}) == "listener"
+    assert top_archetype({"sage": 2, "listener": 1}) == "sage"
@@ -0,0 +1,112 @@
+import asyncio
+import gzip
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from compression import GZipCompleteMiddleware
+from llm_stream import ChatStream
+
+CHUNK_DELAY = 0.2
+
+
+async def call(app, method, path, body=b""):
+    """Drive an ASGI app with a gzip-accepting request; return (start, [(seconds, body message)])"""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip, deflate, br"), (b"content-type", b"application/json")],
+        "server": ("test", 80), "client": ("127.0.0.1", 1),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    began = time.perf_counter()
+    start, messages = {}, []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            messages.append((time.perf_counter() - began, message))
+
+    await app(scope, receive, send)
+    return start, messages
+
+
+def slow_app():
+    app = FastAPI()
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"data: {i}\n\n" * 100
+                await asyncio.sleep(CHUNK_DELAY)
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    @app.get("/big")
+    async def big():
+        return JSONResponse([{"id": i, "text": "reflection"} for i in range(200)])
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    app.add_middleware(GZipCompleteMiddleware, minimum_size=1024)
+    return app
+
+
+def test_streamed_chunks_are_sent_as_produced_and_uncompressed():
+    start, messages = asyncio.run(call(slow_app(), "GET", "/stream"))
+    headers = dict(start["headers"])
+    assert b"content-encoding" not in headers
+    chunks = [(at, message["body"]) for at, message in messages if message["body"]]
+    assert len(chunks) == 3
+    assert chunks[0][1].startswith(b"data: 0")
+    assert chunks[0][0] < CHUNK_DELAY / 2
+    assert chunks[1][0] < 2 * CHUNK_DELAY
+
+
+def test_complete_responses_are_compressed_above_minimum_size():
+    start, messages = asyncio.run(call(slow_app(), "GET", "/big"))
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    body = messages[0][1]["body"]
+    assert headers[b"content-length"] == str(len(body)).encode()
+    assert len(json.loads(gzip.decompress(body))) == 200
+
+    start, messages = asyncio.run(call(slow_app(), "GET", "/small"))
+    assert b"content-encoding" not in dict(start["headers"])
+    assert json.loads(messages[0][1]["body"]) == {"ok": True}
+
+
+def test_sse_reflection_fragments_arrive_before_the_stream_finishes(server, monkeypatch):
+    async def provider_events():
+        for fragment in ["I sense ", "something ", "stirring."]:
+            yield f"data: {json.dumps({'choices': [{'delta': {'content': fragment}}]})}\n\n".encode()
+            await asyncio.sleep(CHUNK_DELAY)
+        yield b"data: [DONE]\n\n"
+
+    provider = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=provider_events())))
+    monkeypatch.setattr(server, "mirror_stream", ChatStream("https://llm.test/v1", "key", "model", "system", client=provider))
+    request = json.dumps({"session_id": "sse-test", "bloom_id": "B1", "journal_text": "hello"}).encode()
+
+    start, messages = asyncio.run(call(server.create_app(), "POST", "/api/mirror/reflect/stream", request))
+    assert start["status"] == 200
+    assert b"content-encoding" not in dict(start["headers"])
+    fragments = [at for at, message in messages if b"event: fragment" in message.get("body", b"")]
+    done = [at for at, message in messages if b"event: done" in message.get("body", b"")]
+    assert len(fragments) == 3
+    assert fragments[0] < CHUNK_DELAY
+    assert fragments[1] < 2 * CHUNK_DELAY < done[0]
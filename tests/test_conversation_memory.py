@@ -0,0 +1,81 @@
+from conversation_memory import ConversationMemory, clip, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_new_session_has_no_context():
+    assert ConversationMemory().context("s1") == ""
+
+
+def test_older_turns_fold_into_the_summary():
+    memory = ConversationMemory(recent_turns=2)
+    memory.record("s1", "B1", "restless but hopeful", "I sense a stirring.", ["restless", "hopeful"])
+    memory.record("s1", "B2", "sitting with grief", "Grief is here with you.", ["grief"])
+    memory.record("s1", "B3", "I must earn rest", "That belief feels heavy.")
+
+    context = memory.context("s1")
+    summary, recent = context.split("\n\n")
+    assert summary == 'Earlier in this journey:\nB1 (restless, hopeful): "restless but hopeful"'
+    assert recent.startswith("Most recent blooms:\nB2 - they wrote: \"sitting with grief\"")
+    assert "B3 - they wrote" in recent
+
+
+def test_context_stays_within_the_token_budget():
+    memory = ConversationMemory(token_budget=120, recent_turns=1)
+    for n in range(1, 9):
+        memory.record("s1", f"B{n}", "a long journal entry " * 20, "a long reply " * 20, ["calm"])
+        assert estimate_tokens(memory.context("s1")) <= 120
+    assert memory.compactions > 0
+    assert "B8 - they wrote" in memory.context("s1")
+
+
+def test_sessions_are_kept_apart():
+    memory = ConversationMemory()
+    memory.record("a", "B1", "my sister Jane", "reply")
+    assert memory.context("b") == ""
+    assert "Jane" in memory.context("a")
+
+
+def test_unknown_session_is_seeded_from_user_history_once():
+    memory = ConversationMemory()
+    context = memory.context("s1", ["first entry", "  ", "second entry"])
+    assert context == 'Earlier in this journey:\nEarlier: "first entry"\nEarlier: "second entry"'
+
+    memory.record("s1", "B3", "third", "reply")
+    assert memory.context("s1", ["something else"]).count("Earlier:") == 2
+
+
+def test_idle_sessions_expire():
+    clock = FakeClock()
+    memory = ConversationMemory(idle_ttl=60, clock=clock)
+    memory.record("s1", "B1", "text", "reply")
+    clock.now += 59
+    assert memory.context("s1") != ""
+    # Reading the context counts as use
+    clock.now += 59
+    assert memory.context("s1") != ""
+    clock.now += 61
+    assert memory.context("s1") == ""
+    assert len(memory) == 0
+
+
+def test_sessions_are_bounded_least_recently_used_first():
+    memory = ConversationMemory(max_sessions=2)
+    memory.record("a", "B1", "text", "reply")
+    memory.record("b", "B1", "text", "reply")
+    memory.context("a")
+    memory.record("c", "B1", "text", "reply")
+    assert memory.context("a") != ""
+    assert memory.context("b") == ""
+    assert len(memory) == 2
+
+
+def test_clip_cuts_on_a_word_boundary():
+    assert clip("one two   three", 10) == "one two three"
+    assert clip("alpha beta gamma delta", 3) == "alpha beta…"
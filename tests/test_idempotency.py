@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from starlette.testclient import TestClient
+
+from idempotency import IdempotencyStore, KeyInProgress, KeyReused, fingerprint
+
+
+def collection():
+    keys = AsyncMongoMockClient()["hall_tests"]["idempotency_keys"]
+    asyncio.run(keys.create_index([("scope", 1), ("key", 1)], unique=True))
+    return keys
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_completed_request_is_replayed_locally_and_on_other_workers():
+    keys = collection()
+
+    async def run():
+        first, other_worker = IdempotencyStore(keys), IdempotencyStore(keys)
+        assert await first.claim("reflect", "k", "f1") is None
+        await first.complete("reflect", "k", "f1", {"text": "hi"})
+        return (
+            await first.claim("reflect", "k", "f1"),
+            await other_worker.claim("reflect", "k", "f1"),
+            first.stats(),
+        )
+
+    local, shared, stats = asyncio.run(run())
+    assert local == shared == {"text": "hi"}
+    assert (stats["claims"], stats["replays"], stats["in_flight"]) == (1, 1, 0)
+
+
+def test_key_reused_with_a_different_body_is_rejected():
+    keys = collection()
+
+    async def run():
+        first, other_worker = IdempotencyStore(keys), IdempotencyStore(keys)
+        await first.claim("reflect", "k", "f1")
+        with pytest.raises(KeyReused):
+            await other_worker.claim("reflect", "k", "f2")
+        await first.complete("reflect", "k", "f1", {"text": "hi"})
+        with pytest.raises(KeyReused):
+            await first.claim("reflect", "k", "f2")
+
+    asyncio.run(run())
+
+
+def test_same_key_in_another_scope_is_independent():
+    keys = collection()
+
+    async def run():
+        store = IdempotencyStore(keys)
+        assert await store.claim("reflect", "k", "f1") is None
+        assert await store.claim("sessions", "k", "f2") is None
+
+    asyncio.run(run())
+
+
+def test_key_in_progress_on_another_worker_conflicts():
+    keys = collection()
+
+    async def run():
+        first, other_worker = IdempotencyStore(keys), IdempotencyStore(keys)
+        await first.claim("reflect", "k", "f1")
+        with pytest.raises(KeyInProgress):
+            await other_worker.claim("reflect", "k", "f1")
+        return other_worker.stats()["conflicts"]
+
+    assert asyncio.run(run()) == 1
+
+
+def test_repeat_on_the_same_worker_waits_for_the_first_request():
+    keys = collection()
+
+    async def run():
+        store = IdempotencyStore(keys)
+        await store.claim("reflect", "k", "f1")
+        repeat = asyncio.create_task(store.claim("reflect", "k", "f1"))
+        await asyncio.sleep(0.01)
+        assert not repeat.done()
+        await store.complete("reflect", "k", "f1", {"text": "hi"})
+        return await repeat
+
+    assert asyncio.run(run()) == {"text": "hi"}
+
+
+def test_released_key_can_be_claimed_again():
+    keys = collection()
+
+    async def run():
+        store = IdempotencyStore(keys)
+        await store.claim("reflect", "k", "f1")
+        await store.release("reflect", "k")
+        return await IdempotencyStore(keys).claim("reflect", "k", "f1")
+
+    assert asyncio.run(run()) is None
+
+
+def test_stale_in_progress_record_is_taken_over():
+    keys = collection()
+
+    async def run():
+        await keys.insert_one({
+            "scope": "reflect", "key": "k", "fingerprint": "f1", "status": "in_progress", "body": None,
+            "created_at": datetime.utcnow() - timedelta(seconds=120),
+        })
+        store = IdempotencyStore(keys, lock_seconds=60)
+        return await store.claim("reflect", "k", "f1")
+
+    assert asyncio.run(run()) is None
+
+
+def test_session_create_replays_for_a_repeated_key(server, monkeypatch):
+    monkeypatch.setattr(server, "idempotency", IdempotencyStore(collection()))
+    client = TestClient(server.create_app())
+    headers = {"Idempotency-Key": "create-once"}
+    first = client.post("/api/sessions", json={"total_sessions": 2}, headers=headers)
+    repeat = client.post("/api/sessions", json={"total_sessions": 2}, headers=headers)
+    assert first.status_code == repeat.status_code == 200
+    assert repeat.json() == first.json()
+    assert repeat.headers["Idempotent-Replayed"] == "true"
+    assert client.post("/api/sessions", json={"total_sessions": 3}, headers=headers).status_code == 422
+    assert client.post("/api/sessions", json={}, headers={"Idempotency-Key": ""}).status_code == 400
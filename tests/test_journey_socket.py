@@ -0,0 +1,86 @@
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from conversation_memory import ConversationMemory
+
+
+class StubChat:
+    async def send_message(self, message):
+        return "I sense something stirring in you."
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    monkeypatch.setattr(server, "mirror_stream", None)
+    monkeypatch.setattr(server, "get_mirror_chat", lambda session_id: StubChat())
+    monkeypatch.setattr(server, "conversation_memory", ConversationMemory())
+    return TestClient(server.create_app())
+
+
+def new_session(client):
+    return client.post("/api/sessions", json={"total_sessions": 1}).json()["id"]
+
+
+def test_unknown_session_is_closed_with_4404(client):
+    with client.websocket_connect("/api/ws/journey/missing") as socket:
+        assert socket.receive_json() == {"type": "error", "detail": "Session not found"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            socket.receive_json()
+    assert closed.value.code == 4404
+
+
+def test_journey_streams_blooms_and_completes(server, client):
+    session_id = new_session(client)
+    with client.websocket_connect(f"/api/ws/journey/{session_id}") as socket:
+        opened = socket.receive_json()
+        assert opened["type"] == "session"
+        assert opened["session"]["id"] == session_id
+
+        socket.send_json({"type": "ping"})
+        assert socket.receive_json() == {"type": "pong"}
+
+        socket.send_json({"type": "bloom", "bloom_id": "B1", "journal_text": "restless"})
+        assert socket.receive_json() == {"type": "start", "bloom_id": "B1"}
+        frames = [socket.receive_json()]
+        while frames[-1]["type"] != "done":
+            frames.append(socket.receive_json())
+        assert {frame["type"] for frame in frames[:-1]} == {"fragment"}
+        assert all(frame["bloom_id"] == "B1" for frame in frames)
+        assert frames[-1]["response"]["text"] == "I sense something stirring in you."
+        assert "restless" in server.conversation_memory.context(session_id)
+
+        socket.send_json({"type": "complete"})
+        assert socket.receive_json() == {"type": "complete"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            socket.receive_json()
+    assert closed.value.code == 1000
+    assert server.conversation_memory.context(session_id) == ""
+
+
+def test_locked_bloom_is_refused(client):
+    session_id = new_session(client)
+    with client.websocket_connect(f"/api/ws/journey/{session_id}") as socket:
+        socket.receive_json()
+        socket.send_json({"type": "bloom", "bloom_id": "B4", "journal_text": "stuck"})
+        assert socket.receive_json() == {
+            "type": "error", "bloom_id": "B4", "detail": "Bloom is locked for this session"
+        }
+
+
+@pytest.mark.parametrize("send, detail", [
+    (lambda socket: socket.send_text("not json"), "Messages must be JSON"),
+    (lambda socket: socket.send_bytes(b'{"type": "ping"}'), "Messages must be JSON"),
+    (lambda socket: socket.send_json({"type": "bloom", "bloom_id": "B9", "journal_text": "x"}),
+     "A bloom needs a bloom_id (B1-B8) and journal_text"),
+    (lambda socket: socket.send_json({"type": "dance"}), "Unknown message type: dance"),
+    (lambda socket: socket.send_json(["ping"]), "Unknown message type: None"),
+])
+def test_bad_messages_get_an_error_frame_and_keep_the_socket_open(client, send, detail):
+    session_id = new_session(client)
+    with client.websocket_connect(f"/api/ws/journey/{session_id}") as socket:
+        socket.receive_json()
+        send(socket)
+        assert socket.receive_json() == {"type": "error", "detail": detail}
+        socket.send_json({"type": "ping"})
+        assert socket.receive_json() == {"type": "pong"}
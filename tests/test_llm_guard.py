@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from llm_guard import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, DeadlineExceeded, LLMGuard, QueueTimeout
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def breaker(clock, **overrides):
+    settings = dict(window=4, min_calls=4, failure_rate=0.5, slow_call_seconds=1.0,
+                    slow_call_rate=0.75, open_seconds=30.0, half_open_probes=1, clock=clock)
+    settings.update(overrides)
+    return CircuitBreaker(**settings)
+
+
+def tripped(clock):
+    b = breaker(clock)
+    for failed in (True, False, True, False):
+        b.before_call()
+        b.record(failed, 0.1)
+    assert b.state == OPEN
+    return b
+
+
+def test_stays_closed_below_min_calls_and_failure_rate():
+    b = breaker(FakeClock())
+    for _ in range(3):
+        b.record(True, 0.1)
+    assert b.state == CLOSED
+    b = breaker(FakeClock())
+    for failed in (True, False, False, False):
+        b.record(failed, 0.1)
+    assert b.state == CLOSED
+
+
+def test_trips_on_failure_rate():
+    b = tripped(FakeClock())
+    assert b.trips == 1
+    with pytest.raises(CircuitOpen):
+        b.before_call()
+
+
+def test_trips_on_slow_call_rate():
+    b = breaker(FakeClock())
+    for latency in (2.0, 2.0, 2.0, 0.1):
+        b.record(False, latency)
+    assert b.state == OPEN
+
+
+def test_half_open_admits_one_probe_and_closes_on_success():
+    clock = FakeClock()
+    b = tripped(clock)
+    clock.now += 29.9
+    with pytest.raises(CircuitOpen):
+        b.before_call()
+
+    clock.now += 0.2
+    b.before_call()
+    assert b.state == HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        b.before_call()
+
+    b.record(False, 0.1)
+    assert b.state == CLOSED
+    assert b.stats()["window_calls"] == 0
+    b.before_call()
+
+
+@pytest.mark.parametrize("failed, latency", [(True, 0.1), (False, 5.0)])
+def test_failed_or_slow_probe_reopens(failed, latency):
+    clock = FakeClock()
+    b = tripped(clock)
+    clock.now += 31
+    b.before_call()
+    b.record(failed, latency)
+    assert b.state == OPEN
+    assert b.trips == 2
+    clock.now += 1
+    with pytest.raises(CircuitOpen):
+        b.before_call()
+
+
+def test_cancelled_probe_gives_its_slot_back():
+    clock = FakeClock()
+    b = tripped(clock)
+    clock.now += 31
+    b.before_call()
+    b.cancel_call()
+    b.before_call()
+    assert b.state == HALF_OPEN
+
+
+def guard(clock, **overrides):
+    settings = dict(deadline_seconds=0.05, max_in_flight=1, max_queue_seconds=0.05)
+    settings.update(overrides)
+    return LLMGuard(breaker(clock), **settings)
+
+
+def test_guard_records_success_and_failure():
+    g = guard(FakeClock())
+
+    async def fail():
+        raise RuntimeError("provider down")
+
+    async def run():
+        assert await g.call(lambda: asyncio.sleep(0, result="ok")) == "ok"
+        with pytest.raises(RuntimeError):
+            await g.call(fail)
+
+    asyncio.run(run())
+    assert (g.successes, g.failures, g.in_flight) == (1, 1, 0)
+    assert g.breaker.stats()["window_failures"] == 1
+
+
+def test_guard_deadline_counts_as_failure():
+    g = guard(FakeClock())
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(g.call(lambda: asyncio.sleep(1)))
+    assert (g.deadline_exceeded, g.failures) == (1, 1)
+
+
+def test_guard_cancellation_is_not_a_failure_and_frees_the_probe():
+    clock = FakeClock()
+    g = LLMGuard(tripped(clock), deadline_seconds=5, max_in_flight=1, max_queue_seconds=1)
+    clock.now += 31
+
+    async def run():
+        task = asyncio.create_task(g.call(lambda: asyncio.sleep(1)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert (g.failures, g.successes, g.in_flight) == (0, 0, 0)
+    assert g.breaker.state == HALF_OPEN
+    g.breaker.before_call()  # the probe slot is free again
+
+
+def test_guard_sheds_queued_calls_and_rejects_when_open():
+    clock = FakeClock()
+    g = guard(clock, deadline_seconds=1)
+
+    async def run():
+        slow = asyncio.create_task(g.call(lambda: asyncio.sleep(0.2)))
+        await asyncio.sleep(0.01)
+        with pytest.raises(QueueTimeout):
+            await g.call(lambda: asyncio.sleep(0))
+        await slow
+
+    asyncio.run(run())
+    assert g.shed_queue == 1
+
+    g.breaker = tripped(clock)
+    with pytest.raises(CircuitOpen):
+        asyncio.run(g.call(lambda: asyncio.sleep(0)))
+    assert g.rejected_open == 1
@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from llm_stream import ChatStream, chat_stream
+
+
+def sse_body(*fragments):
+    events = [{"choices": [{"delta": {"role": "assistant"}}]}]
+    events += [{"choices": [{"delta": {"content": fragment}}]} for fragment in fragments]
+    lines = [f"data: {json.dumps(event)}\n\n" for event in events]
+    return "".join(lines) + "data: [DONE]\n\n"
+
+
+def test_stream_yields_content_deltas_and_sends_prompt():
+    seen = {}
+
+    def handler(request):
+        seen["url"] = str(request.url)
+        seen["auth"] = request.headers["authorization"]
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, text=sse_body("I hear ", "you."))
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        stream = ChatStream("https://llm.test/v1/", "key", "gpt-4o-mini", "system", client=client)
+        fragments = [fragment async for fragment in stream.stream("prompt")]
+        await stream.close()
+        return fragments
+
+    assert asyncio.run(run()) == ["I hear ", "you."]
+    assert seen["url"] == "https://llm.test/v1/chat/completions"
+    assert seen["auth"] == "Bearer key"
+    assert seen["body"]["stream"] is True
+    assert seen["body"]["messages"] == [
+        {"role": "system", "content": "system"}, {"role": "user", "content": "prompt"}
+    ]
+
+
+def test_stream_raises_on_provider_error():
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+        stream = ChatStream("https://llm.test/v1", "key", "gpt-4o-mini", "system", client=client)
+        return [fragment async for fragment in stream.stream("prompt")]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+
+def test_no_stream_without_a_key():
+    assert chat_stream("https://llm.test/v1", None, "gpt-4o-mini", "system", 20.0) is None
@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from starlette.testclient import TestClient
+
+from conversation_memory import ConversationMemory
+from reflection_cache import ReflectionCache
+
+
+class RecordingChat:
+    def __init__(self):
+        self.prompts = []
+
+    async def send_message(self, message):
+        self.prompts.append(message.text)
+        return f"Fresh reply {len(self.prompts)}"
+
+
+@pytest.fixture
+def llm(server, monkeypatch):
+    chat = RecordingChat()
+    monkeypatch.setattr(server, "get_mirror_chat", lambda session_id: chat)
+    monkeypatch.setattr(server, "conversation_memory", ConversationMemory())
+    cache = ReflectionCache(AsyncMongoMockClient()["hall_tests"]["reflection_cache"], enabled=True)
+    monkeypatch.setattr(server, "reflection_cache", cache)
+    return chat
+
+
+def entry(n):
+    return {"session_id": f"session-{n}", "bloom_id": "B2", "journal_text": "tired"}
+
+
+def test_batch_regenerates_cached_reflections(server, llm):
+    stale = {"text": "Stale reply", "tone_tags": [], "archetype_id": None}
+    version = server.prompt_templates.version
+    asyncio.run(server.reflection_cache.set("B2", "tired", stale, version))
+
+    response = TestClient(server.create_app()).post("/api/mirror/reflect/batch", json={"requests": [entry(1)]})
+    assert response.status_code == 200
+    (line,) = [json.loads(line) for line in response.text.splitlines()]
+    assert line["status"] == "ok"
+    assert line["response"]["text"] == "Fresh reply 1"
+    assert len(llm.prompts) == 1
+
+    # The fresh reply replaces the stale one for interactive callers
+    assert asyncio.run(server.reflection_cache.get("B2", "tired", version))["text"] == "Fresh reply 1"
+
+
+def test_batch_size_is_capped(server, llm):
+    client = TestClient(server.create_app())
+    requests = [entry(n) for n in range(server.MIRROR_BATCH_MAX_ITEMS + 1)]
+    assert client.post("/api/mirror/reflect/batch", json={"requests": requests}).status_code == 422
+    assert llm.prompts == []
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from conversation_memory import ConversationMemory
+
+
+class StatefulChat:
+    """Stands in for LlmChat, which resends its whole history on every call"""
+
+    def __init__(self, sent):
+        self.history = []
+        self.sent = sent
+
+    async def send_message(self, message):
+        self.history.append(message.text)
+        self.sent.append(list(self.history))
+        reply = f"I sense something stirring ({len(self.sent)})"
+        self.history.append(reply)
+        return reply
+
+
+@pytest.fixture
+def sent(server, monkeypatch):
+    sent = []
+    monkeypatch.setattr(server, "create_mirror_chat", lambda session_id: StatefulChat(sent))
+    monkeypatch.setattr(server, "conversation_memory", ConversationMemory(token_budget=200))
+    return sent
+
+
+def test_each_bloom_sends_only_its_own_prompt(server, sent):
+    async def journey():
+        for n in range(1, 9):
+            request = server.MirrorRequest(session_id="s", bloom_id=f"B{n}", journal_text=f"entry {n} " * 40)
+            await server.generate_reflection(request, record_rollups=False)
+            server.conversation_memory.record("s", request.bloom_id, request.journal_text, "reply")
+
+    asyncio.run(journey())
+    assert [len(messages) for messages in sent] == [1] * 8
+    # Earlier blooms reach the provider only through the bounded memory section
+    assert "entry 1" not in sent[-1][0]
+    assert len(sent[-1][0]) <= len(sent[1][0]) + 400
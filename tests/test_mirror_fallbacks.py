@@ -0,0 +1,35 @@
+import pytest
+
+import metrics
+from llm_guard import CircuitOpen
+
+
+@pytest.fixture
+def fallbacks(monkeypatch):
+    counter = metrics.Counter("hall_mirror_fallbacks_total", "test", ("reason",))
+    monkeypatch.setattr(metrics, "mirror_fallbacks", counter)
+    return counter
+
+
+def request(server):
+    return server.MirrorRequest(session_id="s", bloom_id="B1", journal_text="hello")
+
+
+@pytest.mark.parametrize("shed_to_rules", [True, False])
+def test_shed_reply_is_counted_once_as_shed(server, fallbacks, monkeypatch, shed_to_rules):
+    monkeypatch.setattr(server, "SHED_TO_RULES", shed_to_rules)
+    server.reflection_fallback(request(server), CircuitOpen("open"))
+    assert fallbacks.snapshot() == {("shed",): 1.0}
+
+
+@pytest.mark.parametrize("shed_to_rules", [True, False])
+def test_limited_reply_is_counted_once_as_limited(server, fallbacks, monkeypatch, shed_to_rules):
+    monkeypatch.setattr(server, "SHED_TO_RULES", shed_to_rules)
+    server.limited_mirror_response(request(server))
+    assert fallbacks.snapshot() == {("limited",): 1.0}
+
+
+def test_llm_error_is_counted_as_error(server, fallbacks):
+    reply = server.reflection_fallback(request(server), RuntimeError("provider down"))
+    assert reply.text.startswith("I'm listening")
+    assert fallbacks.snapshot() == {("error",): 1.0}
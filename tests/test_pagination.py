@@ -0,0 +1,74 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, fetch_page, keyset_filter, projection_for, stream_ndjson
+)
+
+
+@pytest.mark.parametrize("sort_value, last_id", [
+    (datetime(2024, 5, 1, 12, 30, 15, 123000), "abc"),
+    ("2024-05-01T12:30:15", "abc"),
+    (42, 7),
+    (None, "z"),
+])
+def test_cursor_round_trip(sort_value, last_id):
+    cursor = encode_cursor(sort_value, last_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (sort_value, last_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(1, 2)[:-3], "e30"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_combines_with_a_base_or():
+    cursor = encode_cursor(5, "b")
+    assert keyset_filter("n", None, False, {"client_id": "c"}) == {"client_id": "c"}
+    assert keyset_filter("n", cursor, True) == {"$or": [{"n": {"$lt": 5}}, {"n": 5, "id": {"$lt": "b"}}]}
+    base = {"$or": [{"a": 1}, {"b": 1}]}
+    assert keyset_filter("n", cursor, False, base) == {
+        "$and": [base, {"$or": [{"n": {"$gt": 5}}, {"n": 5, "id": {"$gt": "b"}}]}]
+    }
+
+
+def test_projection_keeps_the_keyset_and_drops_unknown_fields():
+    assert projection_for(None, ["a"], ["n", "id"]) == {"_id": 0}
+    assert projection_for("a, secret", ["a", "b"], ["n", "id"]) == {"_id": 0, "a": 1, "n": 1, "id": 1}
+
+
+def documents():
+    # Repeated sort values make the id tie-break matter
+    return [{"id": f"{i:02d}", "n": i // 3} for i in range(10)]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_every_document_once(descending):
+    async def run():
+        collection = AsyncMongoMockClient()["hall_tests"]["items"]
+        await collection.insert_many(documents())
+        seen, cursor = [], None
+        while True:
+            page, cursor = await fetch_page(collection, "n", 4, cursor, descending=descending)
+            seen += [document["id"] for document in page]
+            if cursor is None:
+                return seen
+
+    expected = sorted(document["id"] for document in documents())
+    assert asyncio.run(run()) == (expected[::-1] if descending else expected)
+
+
+def test_stream_resumes_after_a_cursor():
+    async def run():
+        collection = AsyncMongoMockClient()["hall_tests"]["items"]
+        await collection.insert_many(documents())
+        _, cursor = await fetch_page(collection, "n", 4)
+        return [json.loads(line) async for line in stream_ndjson(collection, "n", cursor, limit=3)]
+
+    assert [document["id"] for document in asyncio.run(run())] == ["04", "05", "06"]
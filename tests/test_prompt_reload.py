@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from starlette.testclient import TestClient
+
+from conversation_memory import ConversationMemory
+from hot_path import BLOOM_CONTEXTS, PromptTemplates
+from reflection_cache import ReflectionCache
+
+
+class RecordingChat:
+    def __init__(self):
+        self.prompts = []
+
+    async def send_message(self, message):
+        self.prompts.append(message.text)
+        return f"Reply {len(self.prompts)}"
+
+
+def test_version_follows_the_prompts():
+    assert PromptTemplates(BLOOM_CONTEXTS).version == PromptTemplates(dict(BLOOM_CONTEXTS)).version
+    assert PromptTemplates(BLOOM_CONTEXTS).version != PromptTemplates({**BLOOM_CONTEXTS, "B2": "New"}).version
+    assert PromptTemplates(BLOOM_CONTEXTS).version != PromptTemplates(BLOOM_CONTEXTS, closing="Be brief.").version
+
+
+@pytest.fixture
+def llm(server, monkeypatch, tmp_path):
+    chat = RecordingChat()
+    monkeypatch.setattr(server, "get_mirror_chat", lambda session_id: chat)
+    monkeypatch.setattr(server, "conversation_memory", ConversationMemory())
+    cache = ReflectionCache(AsyncMongoMockClient()["hall_tests"]["reflection_cache"], enabled=True)
+    monkeypatch.setattr(server, "reflection_cache", cache)
+    prompts = tmp_path / "prompts.json"
+    monkeypatch.setattr(server, "MIRROR_PROMPTS_FILE", str(prompts))
+    monkeypatch.setattr(server, "prompt_templates", PromptTemplates(BLOOM_CONTEXTS))
+    return chat, prompts
+
+
+def test_reload_stops_serving_replies_written_with_the_old_prompts(server, llm):
+    chat, prompts = llm
+
+    def reflect(session_id):
+        request = server.MirrorRequest(session_id=session_id, bloom_id="B2", journal_text="tired")
+        return asyncio.run(server.generate_reflection(request, record_rollups=False)).text
+
+    assert reflect("a") == reflect("b") == "Reply 1"
+
+    prompts.write_text(json.dumps({"contexts": {"B2": "The user is resting with a feeling."}}))
+    response = TestClient(server.create_app()).post("/api/mirror/prompts/reload")
+    assert response.status_code == 200
+    assert response.json()["version"] == server.prompt_templates.version
+
+    assert reflect("c") == "Reply 2"
+    assert chat.prompts[-1].startswith("Context: The user is resting with a feeling.")
+    assert reflect("d") == "Reply 2"
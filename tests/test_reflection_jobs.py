@@ -0,0 +1,169 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from reflection_jobs import ReflectionJobQueue
+
+
+def queue(process, **overrides):
+    settings = dict(workers=1, poll_interval=0.01, max_attempts=3, retry_backoff=0.01)
+    settings.update(overrides)
+    return ReflectionJobQueue(AsyncMongoMockClient()["hall_tests"]["reflection_jobs"], process, **settings)
+
+
+def run_job(jobs, request, priority="interactive"):
+    async def run():
+        jobs.start()
+        try:
+            job = await jobs.enqueue(request, priority)
+            return await jobs.wait(job["id"], timeout=2)
+        finally:
+            await jobs.close()
+    return asyncio.run(run())
+
+
+def test_job_is_done_with_the_processed_reply():
+    async def process(request):
+        return {"text": request["journal_text"].upper()}
+
+    jobs = queue(process)
+    job = run_job(jobs, {"journal_text": "calm"})
+    assert (job["status"], job["response"], job["attempts"]) == ("done", {"text": "CALM"}, 1)
+    assert jobs._finished == {} and jobs._waiters == {}
+
+
+def test_failing_job_is_retried_then_failed_with_the_fallback():
+    calls = []
+
+    async def process(request):
+        calls.append(request)
+        raise RuntimeError("provider down")
+
+    jobs = queue(process, fallback=lambda request, error: {"text": "fallback", "why": str(error)})
+    job = run_job(jobs, {"journal_text": "calm"})
+    assert len(calls) == 3
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 3, "provider down")
+    assert job["response"] == {"text": "fallback", "why": "provider down"}
+    assert (jobs.retried, jobs.failed, jobs.completed) == (2, 1, 0)
+
+
+def test_job_succeeding_on_retry_is_done():
+    attempts = []
+
+    async def process(request):
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("blip")
+        return {"text": "ok"}
+
+    job = run_job(queue(process), {})
+    assert (job["status"], job["attempts"], job["response"]) == ("done", 2, {"text": "ok"})
+
+
+def test_retries_back_off():
+    started = []
+
+    async def process(request):
+        started.append(asyncio.get_running_loop().time())
+        raise RuntimeError("provider down")
+
+    job = run_job(queue(process, retry_backoff=0.1, max_retry_backoff=0.15), {})
+    assert job["status"] == "failed"
+    first, second, third = started
+    assert second - first >= 0.1
+    assert third - second >= 0.15
+
+
+class Refused(Exception):
+    pass
+
+
+def test_refused_jobs_are_deferred_without_using_up_attempts():
+    calls = []
+
+    async def process(request):
+        calls.append(1)
+        if len(calls) <= 5:
+            raise Refused("LLM circuit breaker is open")
+        return {"text": "ok"}
+
+    def defer(error):
+        return 0.01 if isinstance(error, Refused) else None
+
+    jobs = queue(process, max_attempts=1, max_retry_backoff=0.02, defer=defer)
+    job = run_job(jobs, {})
+    assert (job["status"], job["attempts"], job["deferrals"]) == ("done", 1, 5)
+    assert (jobs.deferred, jobs.retried, jobs.failed) == (5, 0, 0)
+
+
+def test_deferred_job_waits_out_the_delay():
+    async def process(request):
+        raise Refused("LLM circuit breaker is open")
+
+    async def run():
+        jobs = queue(process, defer=lambda error: 60.0)
+        jobs.start()
+        job = await jobs.enqueue({})
+        waited = await jobs.wait(job["id"], timeout=0.2)
+        await jobs.close()
+        return jobs, waited
+
+    jobs, job = asyncio.run(run())
+    assert (job["status"], job["attempts"], jobs.deferred) == ("queued", 0, 1)
+    assert (job["available_at"] - job["created_at"]).total_seconds() >= 59
+
+
+def test_interactive_jobs_are_claimed_before_batch_jobs():
+    order = []
+
+    async def process(request):
+        order.append(request["n"])
+        return {}
+
+    async def run():
+        jobs = queue(process)
+        for n, priority in ((1, "batch"), (2, "interactive"), (3, "batch"), (4, "interactive")):
+            last = await jobs.enqueue({"n": n}, priority)
+        jobs.start()
+        await jobs.wait(last["id"], timeout=2)
+        while jobs.completed < 4:
+            await asyncio.sleep(0.01)
+        await jobs.close()
+
+    asyncio.run(run())
+    assert order == [2, 4, 1, 3]
+
+
+def test_wait_drops_its_event_when_it_times_out():
+    async def process(request):
+        return {}
+
+    async def run():
+        jobs = queue(process)  # never started, so the job stays queued
+        job = await jobs.enqueue({})
+        waited = await asyncio.gather(jobs.wait(job["id"], 0.05), jobs.wait(job["id"], 0.02))
+        return jobs, waited
+
+    jobs, waited = asyncio.run(run())
+    assert [job["status"] for job in waited] == ["queued", "queued"]
+    assert jobs._finished == {} and jobs._waiters == {}
+
+
+def test_server_jobs_fail_with_the_fallback_reply_when_the_llm_fails(server, monkeypatch):
+    async def llm_down(request, record_rollups=True, read_cache=True):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(server, "generate_reflection", llm_down)
+    jobs = queue(server.run_reflection_job, fallback=server.reflection_job_fallback, max_attempts=2)
+    job = run_job(jobs, {"session_id": "s", "bloom_id": "B1", "journal_text": "calm"})
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 2, "provider down")
+    assert job["response"]["text"].startswith("I'm listening")
+
+
+def test_server_defers_jobs_the_llm_guard_refused(server):
+    from llm_guard import CircuitOpen, DeadlineExceeded, QueueTimeout
+
+    assert server.defer_reflection_job(CircuitOpen("open")) == server.llm_guard.breaker.stats()["open_for_seconds"]
+    assert server.defer_reflection_job(QueueTimeout("busy")) is not None
+    assert server.defer_reflection_job(DeadlineExceeded("slow")) is None
+    assert server.defer_reflection_job(RuntimeError("provider down")) is None
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from conversation_memory import ConversationMemory
+from reflection_cache import ReflectionCache
+
+
+class RecordingChat:
+    def __init__(self):
+        self.prompts = []
+
+    async def send_message(self, message):
+        self.prompts.append(message.text)
+        return f"Reply {len(self.prompts)}: {message.text}"
+
+
+@pytest.fixture
+def llm(server, monkeypatch):
+    chat = RecordingChat()
+    monkeypatch.setattr(server, "get_mirror_chat", lambda session_id: chat)
+    monkeypatch.setattr(server, "conversation_memory", ConversationMemory())
+    cache = ReflectionCache(AsyncMongoMockClient()["hall_tests"]["reflection_cache"], enabled=True)
+    monkeypatch.setattr(server, "reflection_cache", cache)
+    return chat
+
+
+def reflect(server, session_id, journal_text):
+    request = server.MirrorRequest(session_id=session_id, bloom_id="B2", journal_text=journal_text)
+    return asyncio.run(server.generate_reflection(request)).text
+
+
+def test_a_sessions_memory_never_reaches_another_session_through_the_cache(server, llm):
+    reflect(server, "session-a", "my sister Jane died last week")
+    reply_a = reflect(server, "session-a", "tired")
+    assert "Jane" in llm.prompts[-1] and "Jane" in reply_a
+
+    reply_b = reflect(server, "session-b", "tired")
+    assert len(llm.prompts) == 3
+    assert "Jane" not in llm.prompts[-1]
+    assert "Jane" not in reply_b
+
+
+def test_prompts_without_memory_still_share_the_cache(server, llm):
+    first = reflect(server, "session-b", "tired")
+    second = reflect(server, "session-c", "tired")
+    assert second == first
+    assert len(llm.prompts) == 1
@@ -0,0 +1,71 @@
+import pytest
+
+import rule_engine
+from rule_engine import BLOOM_RESPONSES, UNKNOWN_BLOOM_TEXT, analyze_text, generate, select_archetype
+
+
+@pytest.mark.parametrize("text, signals", [
+    # Same as the frontend's includes()
+    ("I feel so restless", ["restless", "rest"]),
+    ("Mostly tired", ["rest"]),
+    ("I should rest", ["should", "rest"]),
+    ("I DON'T KNOW", ["uncertainty"]),
+    ("I don’t know", ["uncertainty"]),
+    ("I can't stop", ["cant"]),
+    ("I can’t stop", ["cant"]),
+    ("peaceful and calm", ["peaceful"]),
+    ("it is too much, I feel trapped", ["stuck", "overwhelmed"]),
+    # Where includes() matched inside another word
+    ("a passing interest", []),
+    ("I feel disheartened", []),
+    ("", []),
+])
+def test_signals_match_at_word_starts(text, signals):
+    assert analyze_text(text) == signals
+
+
+def test_signals_come_in_declaration_order():
+    assert analyze_text("tired, so I should be patient") == ["should", "patience", "rest"]
+
+
+def test_first_signal_of_the_bloom_picks_the_reply():
+    assert generate("B2", "heavy, yet peaceful").text == BLOOM_RESPONSES["B2"]["signals"]["heavy"]
+    assert generate("B2", "nothing in particular").text == BLOOM_RESPONSES["B2"]["base"]
+    # Signals of other blooms do not count
+    assert generate("B2", "I should").text == BLOOM_RESPONSES["B2"]["base"]
+
+
+def test_unknown_bloom():
+    assert generate("B9", "restless") == rule_engine.RuleReply(UNKNOWN_BLOOM_TEXT, [], None)
+
+
+@pytest.mark.parametrize("text, last_tone_tags, archetype_id", [
+    ("I have learned to be patient", (), "listener"),
+    ("I am excited", (), "seeker"),
+    ("I love them", (), "guardian"),
+    ("I want to create", (), "creator"),
+    ("I finally understand", (), "sage"),
+    ("nothing in particular", (), "listener"),
+    ("nothing in particular", ("love",), "guardian"),
+    # The first rule that matches wins
+    ("I am excited and patient", (), "listener"),
+])
+def test_b8_text_names_its_archetype(text, last_tone_tags, archetype_id):
+    reply = generate("B8", text, last_tone_tags)
+    assert reply.archetype_id == archetype_id
+    assert reply.text == BLOOM_RESPONSES["B8"]["archetypes"][archetype_id]
+
+
+def test_only_b8_has_an_archetype():
+    assert generate("B5", "I trust it").archetype_id is None
+
+
+def test_select_archetype_defaults_to_listener():
+    assert select_archetype([]) == "listener"
+
+
+def test_server_keeps_the_rule_archetype_with_its_text(server):
+    request = server.MirrorRequest(session_id="s", bloom_id="B8", journal_text="I want to create")
+    response = server.rule_based_response(request)
+    assert response.archetype_id == "creator"
+    assert response.text.startswith("The Creator")
@@ -0,0 +1,100 @@
+import asyncio
+import gzip
+import json
+import zlib
+from datetime import datetime
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import UpdateOne
+from starlette.testclient import TestClient
+
+from sync import SYNC_TABLES, PayloadTooLarge, apply_sync, build_upserts, decode_body, get_high_water_marks
+
+SYNCED_AT = datetime(2024, 5, 1, 12, 0)
+
+
+@pytest.mark.parametrize("encoding, encode", [
+    (None, lambda data: data),
+    ("identity", lambda data: data),
+    ("gzip", gzip.compress),
+    (" GZIP ", gzip.compress),
+    ("deflate", zlib.compress),
+])
+def test_decode_body(encoding, encode):
+    assert decode_body(encode(b'{"client_id": "c"}'), encoding) == b'{"client_id": "c"}'
+
+
+def test_decode_body_caps_the_inflated_size():
+    bomb = gzip.compress(b"0" * 10_000)
+    assert len(bomb) < 100
+    with pytest.raises(PayloadTooLarge):
+        decode_body(bomb, "gzip", max_bytes=1000)
+    with pytest.raises(PayloadTooLarge):
+        decode_body(b"0" * 1001, None, max_bytes=1000)
+    assert decode_body(b"0" * 1000, None, max_bytes=1000) == b"0" * 1000
+
+
+def test_decode_body_rejects_bad_encodings():
+    with pytest.raises(ValueError, match="Invalid gzip body"):
+        decode_body(b"not gzip", "gzip")
+    with pytest.raises(ValueError, match="Unsupported Content-Encoding"):
+        decode_body(b"{}", "br")
+
+
+def test_build_upserts():
+    records = [
+        {"id": 1, "createdAt": "2024-04-01T10:00:00Z", "text": "one", "_id": "x", "$set": 1, "a.b": 2},
+        {"id": 2, "createdAt": 1714564800000, "text": "two"},
+        {"id": 3, "createdAt": "not a date"},
+        {"text": "no key"},
+    ]
+    operations, newest, rejected = build_upserts("c", SYNC_TABLES["reflections"], records, SYNCED_AT)
+    assert rejected == 1
+    assert newest == datetime(2024, 5, 1, 12, 0)
+
+    assert operations[0] == UpdateOne({"client_id": "c", "local_key": 1}, {"$set": {
+        "id": 1, "createdAt": "2024-04-01T10:00:00Z", "text": "one",
+        "client_id": "c", "local_key": 1, "created_at": datetime(2024, 4, 1, 10, 0), "synced_at": SYNCED_AT,
+    }}, upsert=True)
+    assert operations[2] == UpdateOne({"client_id": "c", "local_key": 3}, {"$set": {
+        "id": 3, "createdAt": "not a date", "client_id": "c", "local_key": 3, "created_at": None, "synced_at": SYNCED_AT,
+    }}, upsert=True)
+
+
+def test_high_water_marks_only_move_forward():
+    db = AsyncMongoMockClient()["hall_tests"]
+
+    async def run():
+        await apply_sync(db, "c", {"reflections": [{"id": 1, "createdAt": "2024-05-02T00:00:00"}]})
+        # A resent older record is upserted but leaves the mark where it was
+        result = await apply_sync(db, "c", {
+            "reflections": [{"id": 1, "createdAt": "2024-05-02T00:00:00"}, {"id": 0, "createdAt": "2024-05-01T00:00:00"}],
+            "sessions": [{"uuid": "s", "startedAt": "2024-04-30T00:00:00"}],
+        })
+        return result, await db["sync_reflections"].count_documents({}), await get_high_water_marks(db, "other")
+
+    result, stored, other = asyncio.run(run())
+    assert result["accepted"] == {"reflections": 2, "sessions": 1}
+    assert stored == 2
+    assert result["high_water_marks"] == {
+        "sessions": "2024-04-30T00:00:00", "reflections": "2024-05-02T00:00:00", "journalEntries": None,
+    }
+    assert other == {"sessions": None, "reflections": None, "journalEntries": None}
+
+
+@pytest.mark.parametrize("body", [b"[]", b'"x"', b"null", b'{"sessions": []}'])
+def test_sync_rejects_bodies_that_are_not_a_sync_request(server, body):
+    response = TestClient(server.create_app()).post("/api/sync", content=body)
+    assert response.status_code == 422
+
+
+def test_sync_rejects_invalid_json(server):
+    assert TestClient(server.create_app()).post("/api/sync", content=b"{").status_code == 400
+
+
+def test_sync_accepts_gzip_bodies(server):
+    body = gzip.compress(json.dumps({"client_id": "c", "journalEntries": [{"id": 7, "createdAt": 0}]}).encode())
+    response = TestClient(server.create_app()).post("/api/sync", content=body, headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.json()["accepted"] == {"sessions": 0, "reflections": 0, "journalEntries": 1}
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import AutoReconnect
+
+from write_behind import WriteBehindBuffer
+
+
+class FlakyCollection:
+    """Collection that refuses every write while down"""
+
+    name = "flaky"
+
+    def __init__(self):
+        self.down = True
+        self.insert_many_calls = 0
+        self.documents = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.insert_many_calls += 1
+        if self.down:
+            raise AutoReconnect("connection refused")
+        self.documents += documents
+
+    async def insert_one(self, document):
+        if self.down:
+            raise AutoReconnect("connection refused")
+        self.documents.append(document)
+
+
+def test_batches_are_written_and_pending_documents_stay_readable():
+    async def run():
+        collection = AsyncMongoMockClient()["hall_tests"]["sessions"]
+        buffer = WriteBehindBuffer(collection, max_batch=2)
+        for i in range(3):
+            await buffer.add({"id": str(i)})
+        assert buffer.get("2") == {"id": "2"}
+        assert await buffer.flush() is True
+        assert buffer.get("2") is None
+        return await collection.count_documents({}), buffer.stats()
+
+    count, stats = asyncio.run(run())
+    assert count == 3
+    assert (stats["pending"], stats["batches"], stats["written"]) == (0, 2, 3)
+
+
+def test_pending_never_exceeds_max_pending_while_writes_fail():
+    async def run():
+        collection = FlakyCollection()
+        buffer = WriteBehindBuffer(collection, max_batch=10, max_pending=5)
+        for i in range(5):
+            await buffer.add({"id": str(i)})
+        for i in range(5, 20):
+            with pytest.raises(AutoReconnect):
+                await buffer.add({"id": str(i)})
+        assert len(buffer._pending) == 5
+
+        collection.down = False
+        await buffer.add({"id": "late"})
+        assert await buffer.flush() is True
+        return sorted(document["id"] for document in collection.documents)
+
+    assert asyncio.run(run()) == ["0", "1", "2", "3", "4", "late"]
+
+
+def test_background_flusher_backs_off_after_failures():
+    async def run():
+        collection = FlakyCollection()
+        buffer = WriteBehindBuffer(collection, flush_interval=0.001, retry_backoff=0.05, max_retry_backoff=0.1)
+        await buffer.add({"id": "a"})
+        buffer.start()
+        await asyncio.sleep(0.3)
+        failing_attempts = collection.insert_many_calls
+
+        collection.down = False
+        await asyncio.sleep(0.15)
+        await buffer.close()
+        return failing_attempts, collection.documents
+
+    failing_attempts, documents = asyncio.run(run())
+    # Without backoff this would be a few hundred attempts
+    assert 2 <= failing_attempts <= 6
+    assert documents == [{"id": "a"}]